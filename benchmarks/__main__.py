@@ -0,0 +1,82 @@
+"""
+Command line of the benchmark suite, run from the root of the repository:
+
+    python -m benchmarks run --output results.json
+    python -m benchmarks run --quick --scenario alignment --noise 0 0.3
+    python -m benchmarks run --log-file "Performance Metrics/small_DataSet.txt" --regex "(a.b*.c.d*.e.f*.g|a.b*.i.j*.k.l*.m.g)"
+    python -m benchmarks compare baseline.json results.json --threshold 0.1
+"""
+import argparse
+import sys
+
+from benchmarks import runner
+
+
+def __run(arguments):
+    if arguments.regex is not None:
+        models = [{"regex": [token for token in arguments.regex if not token.isspace()]}]
+    else:
+        models = runner.model_configurations(arguments.depth, arguments.branching, arguments.loop_probability, arguments.activities, arguments.seed)
+    if arguments.log_file is not None:
+        logs = [{"file": log_file} for log_file in arguments.log_file]
+    else:
+        logs = runner.log_configurations(arguments.traces, arguments.trace_length, arguments.noise, arguments.seed)
+    results = runner.run(models, logs, arguments.scenario, arguments.repeat, progress=lambda message: print(message, file=sys.stderr))
+    print("%-10s %8s %8s %10s %10s %12s %12s" % ("scenario", "places", "events", "p50 ms", "p99 ms", "ops/s", "peak KB"))
+    for result in results["results"]:
+        print("%-10s %8d %8s %10.3f %10.3f %12.1f %12.1f" % (result["scenario"], result["model"]["places"],
+                                                            "-" if result["log"] is None else result["log"]["events"],
+                                                            result["p50_ms"], result["p99_ms"], result["operations_per_second"] or 0, result["peak_memory_kb"]))
+    if arguments.output is not None:
+        runner.save_results(results, arguments.output)
+    return 0
+
+
+def __compare(arguments):
+    comparisons = runner.compare(runner.load_results(arguments.baseline), runner.load_results(arguments.current), arguments.threshold)
+    regressions = 0
+    for key, metric, old_value, new_value, change, regression in comparisons:
+        if regression:
+            regressions += 1
+        if regression or arguments.verbose:
+            print("%s %s %s: %.3f -> %.3f (%+.1f%%)" % ("REGRESSION" if regression else "ok", key, metric, old_value, new_value, change * 100))
+    print(str(regressions) + " regressions in " + str(len(comparisons)) + " compared metrics")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks of model building, replay and alignment.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="measure the scenarios and optionally save the results as JSON")
+    run_parser.add_argument("--scenario", nargs="+", choices=runner.SCENARIOS, default=list(runner.SCENARIOS))
+    run_parser.add_argument("--depth", nargs="+", type=int, default=[2, 3], help="nesting depths of the random models")
+    run_parser.add_argument("--branching", nargs="+", type=int, default=[3], help="number of sub expressions per level")
+    run_parser.add_argument("--loop-probability", nargs="+", type=float, default=[0.3], help="probability of a loop around a sub expression")
+    run_parser.add_argument("--activities", type=int, default=8, help="number of different activities")
+    run_parser.add_argument("--traces", nargs="+", type=int, default=[500], help="number of traces of the random logs")
+    run_parser.add_argument("--trace-length", nargs="+", type=int, default=[10, 40], help="length of the traces of the random logs")
+    run_parser.add_argument("--noise", nargs="+", type=float, default=[0.0, 0.2], help="probability of a change of each event")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--regex", help="regular expression of the model instead of random models, one character per token")
+    run_parser.add_argument("--log-file", nargs="+", help="text logs with one trace per line instead of random logs")
+    run_parser.add_argument("--repeat", type=int, default=5, help="repetitions of the build and log scenarios")
+    run_parser.add_argument("--quick", action="store_true", help="small models and logs for a fast check")
+    run_parser.add_argument("--output", help="JSON file the results are written to")
+
+    compare_parser = commands.add_parser("compare", help="compare two saved runs and report regressions")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="tolerated relative change (default 0.1)")
+    compare_parser.add_argument("--verbose", action="store_true", help="also print the metrics that did not get worse")
+
+    arguments = parser.parse_args(argv)
+    if arguments.command == "run":
+        if arguments.quick:
+            arguments.depth, arguments.traces, arguments.trace_length, arguments.repeat = [2], [100], [10], 2
+        return __run(arguments)
+    return __compare(arguments)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+import collections
+import random
+import string
+
+from library.nfa import CompiledNfa, compiled_model
+
+# activities must be single letters to be accepted by nfa_from_regex
+ACTIVITIES = string.ascii_letters
+
+
+def random_regex(depth=3, branching=3, loop_probability=0.3, number_of_activities=8, seed=0):
+    """
+    Function that generates a random regular expression with a given shape.
+    Each level of the expression is a sequence or a choice of sub expressions, and every sub expression is put in a loop with the given probability.
+
+    Parameters
+    ----------
+    depth : integer
+        number of nested levels of sequences and choices, 0 is a single activity. (Default: 3)
+    branching : integer
+        number of sub expressions of each sequence or choice. (Default: 3)
+    loop_probability : float
+        probability that a sub expression is followed by the star operator. (Default: 0.3)
+    number_of_activities : integer
+        number of different activities, at most 52. (Default: 8)
+    seed : integer
+        seed of the random generator, the same seed always gives the same expression. (Default: 0)
+
+    Returns
+    -------
+    regex : list of characters
+        the regular expression, which can be passed to nfa_from_regex.
+    """
+    generator = random.Random(seed)
+    activities = ACTIVITIES[:max(1, min(number_of_activities, len(ACTIVITIES)))]
+
+    def sub_expression(level):
+        if level == 0:
+            tokens = [generator.choice(activities)]
+        else:
+            operator = generator.choice([".", "|"])
+            tokens = ["("]
+            for child in range(branching):
+                if child > 0:
+                    tokens.append(operator)
+                tokens += sub_expression(level - 1)
+            tokens.append(")")
+        if generator.random() < loop_probability:
+            tokens.append("*")
+        return tokens
+
+    return sub_expression(depth)
+
+
+def __steps_to_end(model):
+    """
+    A helping function that computes the smallest number of transitions from each place to an accepting place, with a backwards breadth first search.
+    """
+    predecessors = [[] for _ in range(model.number_of_places)]
+    for place in range(model.number_of_places):
+        for t in range(model.transition_offsets[place], model.transition_offsets[place + 1]):
+            predecessors[model.transition_targets[t]].append(place)
+    steps = [None] * model.number_of_places
+    queue = collections.deque(model.end_places)
+    for place in model.end_places:
+        steps[place] = 0
+    while queue:
+        place = queue.popleft()
+        for start_place in predecessors[place]:
+            if steps[start_place] is None:
+                steps[start_place] = steps[place] + 1
+                queue.append(start_place)
+    return steps
+
+
+def random_log(nfa_model, number_of_traces=1000, trace_length=20, noise_rate=0.1, seed=0):
+    """
+    Function that generates a random log of a model.
+    Each trace is a random run of the model that ends in an accepting place once it has about the given length,
+    afterwards each event is removed, swapped with the next one or preceded by a random activity with the given probability.
+
+    Parameters
+    ----------
+    nfa_model : Nfa or CompiledNfa object
+        the model whose behaviour is generated
+    number_of_traces : integer
+        number of traces of the log. (Default: 1000)
+    trace_length : integer
+        length of the random runs, a run can be longer if the model needs more events to end or shorter if it can not continue. (Default: 20)
+    noise_rate : float
+        probability of a change for each event, 0 gives only fitting traces. (Default: 0.1)
+    seed : integer
+        seed of the random generator, the same seed always gives the same log. (Default: 0)
+
+    Returns
+    -------
+    log : list of list of strings
+        the generated traces.
+    """
+    model = compiled_model(nfa_model)
+    generator = random.Random(seed)
+    steps_to_end = __steps_to_end(model)
+    activities = model.activities[1:] or [ACTIVITIES[0]]
+
+    def follow(transition_number, trace):
+        if model.transition_activities[transition_number] != CompiledNfa.EPSILON_ID:
+            trace.append(model.activities[model.transition_activities[transition_number]])
+        return model.transition_targets[transition_number]
+
+    log = []
+    for _ in range(number_of_traces):
+        trace = []
+        place = model.start_place
+        # random run until the trace is long enough, at most a few times as many moves as events to not get stuck in epsilon loops
+        for _ in range(4 * trace_length + 4):
+            if len(trace) >= trace_length:
+                break
+            transitions = [t for t in range(model.transition_offsets[place], model.transition_offsets[place + 1])
+                           if steps_to_end[model.transition_targets[t]] is not None]
+            if not transitions:
+                break
+            place = follow(generator.choice(transitions), trace)
+        # shortest way to an accepting place
+        while steps_to_end[place] is not None and steps_to_end[place] > 0:
+            transitions = [t for t in range(model.transition_offsets[place], model.transition_offsets[place + 1])
+                           if steps_to_end[model.transition_targets[t]] == steps_to_end[place] - 1]
+            place = follow(generator.choice(transitions), trace)
+
+        noisy_trace = []
+        i = 0
+        while i < len(trace):
+            if generator.random() >= noise_rate:
+                noisy_trace.append(trace[i])
+            else:
+                change = generator.randrange(3)
+                if change == 1:
+                    noisy_trace += [generator.choice(activities), trace[i]]
+                elif change == 2 and i + 1 < len(trace):
+                    noisy_trace += [trace[i + 1], trace[i]]
+                    i += 1
+                # change 0 removes the event
+            i += 1
+        log.append(noisy_trace)
+    return log
@@ -0,0 +1,246 @@
+import gc
+import itertools
+import json
+import math
+import platform
+import time
+import tracemalloc
+
+from library import conformance, nfa
+from library.nfa import compiled_model
+from library.event_log import read_text_log
+from benchmarks.generators import random_regex, random_log
+
+SCENARIOS = ("build", "replay", "alignment", "log")
+FORMAT_VERSION = 1
+
+
+def model_configurations(depths=(2, 3), branchings=(3,), loop_probabilities=(0.3,), number_of_activities=8, seed=0):
+    """
+    Function that returns the parameters of all combinations of the given model shapes.
+    """
+    return [{"depth": depth, "branching": branching, "loop_probability": loop_probability, "number_of_activities": number_of_activities, "seed": seed}
+            for depth, branching, loop_probability in itertools.product(depths, branchings, loop_probabilities)]
+
+
+def log_configurations(numbers_of_traces=(500,), trace_lengths=(10, 40), noise_rates=(0.0, 0.2), seed=0):
+    """
+    Function that returns the parameters of all combinations of the given log shapes.
+    """
+    return [{"number_of_traces": number_of_traces, "trace_length": trace_length, "noise_rate": noise_rate, "seed": seed}
+            for number_of_traces, trace_length, noise_rate in itertools.product(numbers_of_traces, trace_lengths, noise_rates)]
+
+
+def percentile(sorted_values, fraction):
+    """
+    Function that returns the value below which the given fraction of the sorted values lie (nearest rank method).
+    """
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))]
+
+
+def measure(operations, number_of_events=None):
+    """
+    Function that runs the operations and returns their latency statistics, throughput and peak memory.
+    The operations are first run with tracemalloc to find the peak memory, which also warms up caches of the model,
+    and then run a second time without tracing the memory to measure the time of each operation, so the tracing does not distort the times.
+
+    Parameters
+    ----------
+    operations : list of functions without parameters
+        the operations that are measured, for example the alignment of each trace of a log
+    number_of_events : integer
+        number of events handled by all operations together, to also report the events per second. (Default: None)
+
+    Returns
+    -------
+    dictonairy
+        operations, total_seconds, operations_per_second, events_per_second, p50_ms, p99_ms, max_ms and peak_memory_kb.
+    """
+    gc.collect()
+    tracemalloc.start()
+    for operation in operations:
+        operation()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    gc.collect()
+    latencies = []
+    for operation in operations:
+        start = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - start)
+    total_seconds = sum(latencies)
+    latencies.sort()
+
+    result = {
+        "operations": len(operations),
+        "total_seconds": total_seconds,
+        "operations_per_second": len(operations) / total_seconds if total_seconds > 0 else None,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+        "peak_memory_kb": peak_memory / 1024,
+    }
+    if number_of_events is not None:
+        result["events_per_second"] = number_of_events / total_seconds if total_seconds > 0 else None
+    return result
+
+
+def run_scenario(scenario, regex, log, repeat=5):
+    """
+    Function that measures one scenario for a model and a log.
+
+    Parameters
+    ----------
+    scenario : str
+        "build" parses and compiles the model repeat times, "replay" checks the fitness and "alignment" computes the optimal alignment of each trace,
+        "log" runs log_fittness and optimal_alignment_log_on_nfa on the whole log repeat times
+    regex : list of characters
+        regular expression of the model
+    log : list of list of strings
+        the traces
+    repeat : integer
+        number of repetitions of the build and log scenarios. (Default: 5)
+
+    Returns
+    -------
+    dictonairy
+        the measurements, see measure.
+    """
+    model = compiled_model(nfa.nfa_from_regex(list(regex)))
+    number_of_events = sum(len(trace) for trace in log)
+    if scenario == "build":
+        return measure([lambda: compiled_model(nfa.nfa_from_regex(list(regex)))] * repeat)
+    if scenario == "replay":
+        return measure([lambda trace=trace: conformance.is_trace_fitting(model, trace) for trace in log], number_of_events)
+    if scenario == "alignment":
+        return measure([lambda trace=trace: conformance.optimal_alignment_trace_on_nfa(model, trace) for trace in log], number_of_events)
+    if scenario == "log":
+        def log_run():
+            conformance.log_fittness(model, log)
+            conformance.optimal_alignment_log_on_nfa(model, log)
+        return measure([log_run] * repeat, number_of_events * repeat)
+    raise ValueError("unknown scenario " + scenario + ", expected one of " + ", ".join(SCENARIOS))
+
+
+def run(models, logs, scenarios=SCENARIOS, repeat=5, progress=None):
+    """
+    Function that measures all scenarios for all combinations of models and logs.
+
+    Parameters
+    ----------
+    models : list of dictonairy
+        parameters of random_regex for each model, or {"regex": [...]} for a given regular expression
+    logs : list of dictonairy
+        parameters of random_log for each log, or {"file": path} for a text log with one trace per line
+    scenarios : list of str
+        the scenarios that are measured. (Default: all)
+    repeat : integer
+        number of repetitions of the build and log scenarios. (Default: 5)
+    progress : function
+        called with a message before each measurement. (Default: None)
+
+    Returns
+    -------
+    dictonairy
+        the environment of the run and one entry per measurement, which can be written to a JSON file.
+    """
+    results = []
+    for model_parameters in models:
+        regex = model_parameters["regex"] if "regex" in model_parameters else random_regex(**model_parameters)
+        model = compiled_model(nfa.nfa_from_regex(list(regex)))
+        model_info = dict(model_parameters, places=model.number_of_places, transitions=len(model.transition_targets))
+        # building the model does not depend on the log
+        if "build" in scenarios:
+            if progress is not None:
+                progress("build " + json.dumps(model_parameters, sort_keys=True))
+            results.append(dict(scenario="build", model=model_info, log=None, **run_scenario("build", regex, [], repeat)))
+        for log_parameters in logs:
+            if "file" in log_parameters:
+                log = list(read_text_log(log_parameters["file"]))
+            else:
+                log = random_log(model, **log_parameters)
+            log_info = dict(log_parameters, events=sum(len(trace) for trace in log))
+            for scenario in scenarios:
+                if scenario == "build":
+                    continue
+                if progress is not None:
+                    progress(scenario + " " + json.dumps(model_parameters, sort_keys=True) + " " + json.dumps(log_parameters, sort_keys=True))
+                results.append(dict(scenario=scenario, model=model_info, log=log_info, **run_scenario(scenario, regex, log, repeat)))
+    return {
+        "format": FORMAT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def save_results(results, path):
+    """
+    Function that writes the results of run into a JSON file.
+    """
+    with open(path, "w") as results_file:
+        json.dump(results, results_file, indent=2)
+
+
+def load_results(path):
+    """
+    Function that reads results written by save_results.
+    """
+    with open(path) as results_file:
+        results = json.load(results_file)
+    if results.get("format") != FORMAT_VERSION:
+        raise ValueError("unsupported results format in " + path)
+    return results
+
+
+def __key(result):
+    """
+    A helping function that identifies a measurement by its scenario and the parameters of its model and log.
+    """
+    model = {name: value for name, value in result["model"].items() if name not in ("places", "transitions")}
+    log = None if result["log"] is None else {name: value for name, value in result["log"].items() if name != "events"}
+    return json.dumps([result["scenario"], model, log], sort_keys=True)
+
+
+def compare(baseline, current, threshold=0.1):
+    """
+    Function that compares two runs and finds the measurements that got worse by more than the threshold.
+    A measurement got worse if its median latency or its peak memory increased or its throughput decreased.
+
+    Parameters
+    ----------
+    baseline : dictonairy
+        results of the earlier run
+    current : dictonairy
+        results of the later run
+    threshold : float
+        relative change that is tolerated, 0.1 is 10 percent. (Default: 0.1)
+
+    Returns
+    -------
+    comparisons : list of tuples
+        (key, metric, baseline value, current value, relative change, is regression) for the metrics of all measurements of both runs.
+    """
+    baseline_results = {__key(result): result for result in baseline["results"]}
+    comparisons = []
+    for result in current["results"]:
+        key = __key(result)
+        if key not in baseline_results:
+            continue
+        # the 99th percentile is reported but not judged, as single slow operations (garbage collection, scheduling) make it noisy
+        for metric, higher_is_better in (("p50_ms", False), ("p99_ms", None), ("operations_per_second", True), ("peak_memory_kb", False)):
+            old_value = baseline_results[key].get(metric)
+            new_value = result.get(metric)
+            if not old_value or new_value is None:
+                continue
+            change = (new_value - old_value) / old_value
+            if higher_is_better is None:
+                regression = False
+            else:
+                regression = -change > threshold if higher_is_better else change > threshold
+            comparisons.append((key, metric, old_value, new_value, change, regression))
+    return comparisons
@@ -0,0 +1,35 @@
+from library import conformance, nfa
+from library.nfa import compiled_model
+from benchmarks.generators import random_regex, random_log
+from benchmarks import runner
+import os
+import tempfile
+import unittest
+class TestBenchmarks(unittest.TestCase):
+    def test_random_regex(self):
+        regex = random_regex(depth=3, branching=2, loop_probability=0.5, seed=7)
+        self.assertEqual(regex, random_regex(depth=3, branching=2, loop_probability=0.5, seed=7))
+        self.assertTrue(nfa.re_expression_check(regex))
+        self.assertEqual(len(random_regex(depth=0, loop_probability=0)), 1)
+
+    def test_random_log(self):
+        model = compiled_model(nfa.nfa_from_regex(random_regex(depth=3, seed=1)))
+        log = random_log(model, number_of_traces=50, trace_length=15, noise_rate=0, seed=1)
+        self.assertEqual(len(log), 50)
+        self.assertEqual(conformance.log_fittness(model, log), 1)
+        self.assertEqual(log, random_log(model, number_of_traces=50, trace_length=15, noise_rate=0, seed=1))
+        self.assertLess(conformance.log_fittness(model, random_log(model, number_of_traces=50, trace_length=15, noise_rate=0.5, seed=1)), 1)
+
+    def test_run_and_compare(self):
+        results = runner.run(runner.model_configurations([1]), runner.log_configurations([5], [5], [0.1]), repeat=1)
+        self.assertEqual([result["scenario"] for result in results["results"]], list(runner.SCENARIOS))
+        for result in results["results"]:
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+            self.assertGreater(result["peak_memory_kb"], 0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.json")
+            runner.save_results(results, path)
+            loaded = runner.load_results(path)
+        self.assertFalse(any(regression for *_, regression in runner.compare(loaded, results)))
+        slower = {"results": [dict(result, p50_ms=result["p50_ms"] * 2) for result in results["results"]]}
+        self.assertEqual(len([comparison for comparison in runner.compare(results, slower) if comparison[5]]), len(runner.SCENARIOS))
@@ -0,0 +1,150 @@
+from library.nfa import CompiledNfa, compiled_model, log_check
+from library.conformance import trace_variants
+from library.model_analysis import ModelAnalysis, model_analysis
+
+
+class BatchAligner:
+    """
+    This class computes the costs of optimal alignments (without the alignments themselves) for many traces at once with NumPy.
+    The cost of an alignment is a shortest path in a graph with one layer of places per position of the trace,
+    so for each trace the cheapest cost of every place is kept in one row of a matrix and all rows are advanced one event at a time.
+    Moves on model only are handled by a precomputed matrix with the cheapest cost from each place to each other place using only moves on model.
+    Traces of the same length are advanced together, so the work per event is a few array operations for the whole batch instead of a search per trace.
+    The matrices have one entry per pair of places and activity, so this is meant for models with up to a few hundred places. NumPy is needed for this class.
+
+    Attributes
+    ----------
+    model : CompiledNfa object
+        the compiled model the traces are aligned to
+    distances : numpy array of int
+        distances[p, q] is the cheapest cost to get from place p to place q with moves on model only, INFINITY if q can not be reached,
+        this is the distance matrix of the analysis of the model
+    step_costs : numpy array of int
+        step_costs[a, p, q] is the cheapest cost to get from place p to place q with a synchronous move on activity a followed by moves on model only,
+        the last entry of the first dimension is for activities that are not in the model and has INFINITY everywhere
+
+    Methods
+    -------
+    __init__ : constructor
+       computes the distance matrices of the model.
+    equal_length_costs : function
+       returns the alignment costs of traces of the same length.
+    log_costs : function
+       returns the alignment costs of all traces of a log.
+    """
+
+    INFINITY = ModelAnalysis.INFINITY # larger than any alignment cost, small enough that sums of two do not overflow
+
+    def __init__(self, nfa_model, batch_size=None):
+        """
+        Constructor of class BatchAligner.
+
+        Parameters
+        ----------
+        nfa_model : Nfa or CompiledNfa object
+            the model the traces are aligned to
+        batch_size : integer, optional
+            maximal number of traces that are advanced together, by default it is chosen so that a batch needs about 32 MB.
+
+        Returns
+        -------
+        None.
+        """
+        import numpy as np
+        model = compiled_model(nfa_model)
+        self.model = model
+        number_of_places = model.number_of_places
+        infinity = self.INFINITY
+
+        # all pairs shortest paths with moves on model only, computed once per compiled model
+        distances = model_analysis(model).distance_matrix
+        self.distances = distances
+
+        # a synchronous move from p to r followed by moves on model only from r to q
+        self.step_costs = np.full((len(model.activities) + 1, number_of_places, number_of_places), infinity, dtype=np.int32)
+        for place in range(number_of_places):
+            for t in range(model.transition_offsets[place], model.transition_offsets[place + 1]):
+                activity = model.transition_activities[t]
+                if activity != CompiledNfa.EPSILON_ID:
+                    np.minimum(self.step_costs[activity, place], distances[model.transition_targets[t]], out=self.step_costs[activity, place])
+
+        self.__end_places = np.array(model.end_places, dtype=np.int64)
+        if batch_size is None:
+            batch_size = max(1, (8 << 20) // max(number_of_places * number_of_places, 1))
+        self.__batch_size = batch_size
+
+    def equal_length_costs(self, traces):
+        """
+        This function returns the cost of an optimal alignment of each of the given traces, which all have the same length.
+        The costs are the same as the costs of optimal_alignment_trace_on_nfa, None if no accepting place of the model can be reached.
+
+        Parameters
+        ----------
+        traces : list of list of strings
+            traces of the same length
+
+        Returns
+        -------
+        list of int
+            the cost of an optimal alignment of each trace in the order of the traces.
+        """
+        import numpy as np
+        if len(traces) == 0:
+            return []
+        length = len(traces[0])
+        for trace in traces:
+            if len(trace) != length:
+                print("Error: all traces of a batch need to have the same length")
+                exit()
+        unknown_activity = len(self.model.activities)
+        activity_ids = self.model.activity_ids
+        events = np.array([[activity_ids.get(activity, unknown_activity) for activity in trace] for trace in traces],
+                          dtype=np.int64).reshape(len(traces), length)
+
+        results = []
+        for first_trace in range(0, len(traces), self.__batch_size):
+            batch_events = events[first_trace:first_trace + self.__batch_size]
+            # costs[b, q]: cheapest cost of aligning the events seen so far of trace b and ending in place q
+            costs = np.repeat(self.distances[None, self.model.start_place], len(batch_events), axis=0)
+            for i in range(length):
+                next_costs = costs + 1 # move on log only, the costs are already closed under moves on model only
+                activities = batch_events[:, i]
+                for activity in np.unique(activities):
+                    if activity == unknown_activity:
+                        continue
+                    rows = np.nonzero(activities == activity)[0]
+                    synchronous_costs = (costs[rows, :, None] + self.step_costs[activity][None, :, :]).min(axis=1)
+                    next_costs[rows] = np.minimum(next_costs[rows], synchronous_costs)
+                costs = np.minimum(next_costs, self.INFINITY)
+            results.append(costs[:, self.__end_places].min(axis=1, initial=self.INFINITY))
+        # a cost of INFINITY means that no alignment exists, which optimal_alignment_trace_on_nfa returns as None
+        return [int(cost) if cost < self.INFINITY else None for cost in np.concatenate(results)]
+
+    def log_costs(self, log):
+        """
+        This function returns the cost of an optimal alignment of each trace of the log.
+        The trace variants are grouped by their length and each group is aligned as one batch.
+
+        Parameters
+        ----------
+        log : list of list of strings
+            the log that contains all the traces that should be aligned with the model
+
+        Returns
+        -------
+        list of int
+            the cost of an optimal alignment of each trace in the order of the log, None if no accepting place of the model can be reached.
+        """
+        variants = trace_variants(log)
+        input_log_check_flag = log_check([list(variant) for variant in variants])
+        if not input_log_check_flag:
+            exit()
+        variants_by_length = {}
+        for variant in variants:
+            variants_by_length.setdefault(len(variant), []).append(variant)
+        costs = [None] * len(log)
+        for same_length_variants in variants_by_length.values():
+            for variant, cost in zip(same_length_variants, self.equal_length_costs(same_length_variants)):
+                for position in variants[variant]:
+                    costs[position] = cost
+        return costs
@@ -0,0 +1,151 @@
+from library.nfa import CompiledNfa, compiled_model, trace_check
+from library.conformance import AlignmentHeuristic
+from library.compact_alignment import CompactAlignment, interned_trace_activities, alignment_codes, START_MOVE, LOG_ONLY_MOVE
+from library.model_analysis import model_analysis
+import heapq
+
+
+def approximate_alignment_beam_search(nfa_model, trace, beam_width=100, heuristic=None, compact=False):
+    """
+    This function computes an alignment of the trace that is optimal or close to optimal, with a bounded amount of work per event.
+    The search goes through the trace one position at a time. For each position it keeps the beam_width most promising places that were reached
+    by consuming the previous event, ranked by their cost plus the estimate of the remaining cost of an AlignmentHeuristic.
+    From these places an A* search over the moves on model only looks for the beam_width cheapest places that can consume the event synchronously,
+    and stops early after visiting 8 times beam_width places. The work per event therefore depends on beam_width and not on the size of the model or the trace,
+    so a larger beam_width gives better alignments and a smaller one faster and more predictable alignments.
+    The alignment is guaranteed to be optimal if no place was dropped that could have led to a cheaper alignment,
+    which is always the case when the search never had more places than it could keep.
+
+    Parameters
+    ----------
+    nfa_model : Nfa or CompiledNfa object
+        nfa that describes the behaviour the trace should be aligned to.
+    trace : list of strings
+        the trace that should be aligned with the model
+    beam_width : integer
+        number of places that are kept for each position of the trace. (Default: 100)
+    heuristic : AlignmentHeuristic object
+        the heuristic tables of the nfa model. By default they are taken from the analysis of the model, which is computed once per compiled model.
+    compact : bool
+        returns the alignment as CompactAlignment object. (Default: False)
+
+    Returns
+    -------
+    alignment: list of tuples of string or CompactAlignment object
+        The first item of the tuple is move on trace and the second is move on model, None if the kept places did not lead to an accepting place.
+    cost_alignment: integer
+        number of not synchronized moves, None if no alignment was found.
+    optimal: bool
+        true if the alignment is guaranteed to be optimal (or, without alignment, if the model has no alignment for the trace).
+    """
+    input_trace_check_flag = trace_check(trace)
+    if not input_trace_check_flag:
+        exit()
+    if beam_width < 1:
+        print("Error: the beam width has to be at least 1")
+        exit()
+    model = compiled_model(nfa_model)
+    if heuristic is None:
+        heuristic = AlignmentHeuristic(model)
+    estimate = heuristic.trace_estimator(trace)
+    analysis = model_analysis(model)
+    distance_to_end = analysis.distance_to_end
+    trace_activities = [model.activity_id(activity) for activity in trace]
+    transition_offsets = model.transition_offsets
+    transition_activities = model.transition_activities
+    transition_targets = model.transition_targets
+
+    # an alignment can always be reordered so that at each position of the trace it first reaches a place with the move that consumes the previous event,
+    # then either consumes the next event with a move on log only, or follows moves on model only to a place that consumes it with a synchronous move
+    # (or at the end of the trace to an accepting place), without changing its cost. Only alignments of this form are searched.
+    # the kept places of each position with the move they were reached with
+    layers = []
+    # the lowest priority of all dropped places, every alignment through a dropped place costs at least this much
+    lowest_dropped_priority = float('inf')
+    # (priority, cost, place, move) of the places reached by the moves that consume the event before the position
+    candidates = [(estimate(model.start_place, 0), 0, model.start_place, START_MOVE)]
+    end_place = None
+    for i in range(len(trace) + 1):
+        # keep the beam_width most promising places that were reached by consuming the previous event
+        cheapest_candidates = {}
+        for candidate in candidates:
+            if candidate[2] not in cheapest_candidates or candidate < cheapest_candidates[candidate[2]]:
+                cheapest_candidates[candidate[2]] = candidate
+        candidates = sorted(cheapest_candidates.values())
+        if len(candidates) > beam_width:
+            lowest_dropped_priority = min(lowest_dropped_priority, candidates[beam_width][0])
+            candidates = candidates[:beam_width]
+
+        # A* search over the moves on model only to the beam_width cheapest places that can consume the event with a synchronous move,
+        # guided by the distance to the closest such place, at the end of the trace to the first accepting place, which is the cheapest one
+        if i < len(trace):
+            distance = analysis.distance_to_activity(trace_activities[i])
+        else:
+            distance = distance_to_end
+        layer = {}
+        layer_costs = {}
+        synchronous_places = []
+        # ties are broken by the order the places were reached in, the last one first, so the search follows the epsilon transitions
+        # straight to the next place that consumes the event instead of visiting all places that are equally close
+        frontier = [(cost + distance[place], cost, 0, place, move) for _, cost, place, move in candidates if distance[place] != float('inf')]
+        heapq.heapify(frontier)
+        number_of_pushes = 0
+        while frontier:
+            _, cost, _, place, move = heapq.heappop(frontier)
+            if place in layer:
+                continue
+            layer[place] = move
+            layer_costs[place] = cost
+            if i == len(trace):
+                if model.is_end_place[place]:
+                    end_place = place
+                    break
+            elif distance[place] == 0 and any(transition_activities[t] == trace_activities[i] for t in range(transition_offsets[place], transition_offsets[place + 1])):
+                synchronous_places.append(place)
+            if i < len(trace) and (len(synchronous_places) == beam_width or len(layer) == 8 * beam_width):
+                # the places that were reached but not visited and the ones after this place are dropped
+                lowest_dropped_priority = min(lowest_dropped_priority, cost + estimate(place, i))
+                for _, cost, _, place, _ in frontier:
+                    if place not in layer:
+                        lowest_dropped_priority = min(lowest_dropped_priority, cost + estimate(place, i))
+                break
+            for t in range(transition_offsets[place], transition_offsets[place + 1]):
+                target = transition_targets[t]
+                if target in layer or distance[target] == float('inf') or distance_to_end[target] == float('inf'):
+                    continue
+                target_cost = cost if transition_activities[t] == CompiledNfa.EPSILON_ID else cost + 1
+                number_of_pushes += 1
+                heapq.heappush(frontier, (target_cost + distance[target], target_cost, -number_of_pushes, target, 2 * t))
+        # the kept places that were not visited by the search before it stopped are still needed for their moves on log only
+        for priority, cost, place, move in candidates:
+            if place not in layer:
+                layer[place] = move
+                layer_costs[place] = cost
+        layers.append(layer)
+        if i == len(trace):
+            break
+
+        # moves on log only from the kept places and synchronous moves from the places found by the search
+        next_candidates = []
+        for _, _, place, _ in candidates:
+            cost = layer_costs[place]
+            next_candidates.append((cost + 1 + estimate(place, i + 1), cost + 1, place, LOG_ONLY_MOVE))
+        for place in synchronous_places:
+            cost = layer_costs[place]
+            for t in range(transition_offsets[place], transition_offsets[place + 1]):
+                target = transition_targets[t]
+                if transition_activities[t] == trace_activities[i] and distance_to_end[target] != float('inf'):
+                    next_candidates.append((cost + estimate(target, i + 1), cost, target, 2 * t + 1))
+        candidates = next_candidates
+
+    if end_place is None:
+        return (None, None, lowest_dropped_priority == float('inf'))
+    cost_alignment = layer_costs[end_place]
+
+    # go back from the accepting place to the start place
+    activities, alignment_activities = interned_trace_activities(model.activities, trace, trace_activities)
+    codes = alignment_codes(transition_offsets, transition_activities, lambda place, i: layers[i][place], end_place, len(trace), alignment_activities)
+    alignment = CompactAlignment(codes, activities)
+    if not compact:
+        alignment = list(alignment)
+    return (alignment, cost_alignment, cost_alignment <= lowest_dropped_priority)
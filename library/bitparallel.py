@@ -0,0 +1,243 @@
+from library.nfa import CompiledNfa, compiled_model
+
+
+class BitParallelNfa:
+    """
+    This class replays traces on a NFA model by storing the set of places the model can be in as a bit mask, bit p is set if place p is active.
+    For each activity and each byte of the mask there is a table with the places that follow on the activity from all 256 combinations of the 8 places of that byte,
+    epsilon closures included, so one event is replayed with one table lookup and one bitwise or per not empty byte of the mask.
+    In this process the masks are Python integers. With fitting_batch, thousands of traces are replayed at once as a NumPy matrix of 64 bit words,
+    where the successor mask of each trace is the bitwise or of the successor masks of its active places, kept only for the activities of the replayed traces.
+    The work per event grows with the number of active places times the number of words of a mask, so for large models, or when the traces reach only a limited number
+    of different sets of places, the LazyDfa of library.dfa is usually faster.
+
+    Attributes
+    ----------
+    model : CompiledNfa object
+        the compiled model the traces are replayed on
+    number_of_bytes : integer
+        number of bytes of a place mask
+    number_of_words : integer
+        number of 64 bit words of a place mask in fitting_batch
+    start_mask : integer
+        mask of the places that are active before the first event
+    end_mask : integer
+        mask of the accepting places
+
+    Methods
+    -------
+    __init__ : constructor
+       computes the mask of the places that follow each place on each activity.
+    successor_mask : function
+       returns the mask of the places that are active after an event.
+    is_trace_fitting : function
+       checks whether a trace is fitting the model.
+    log_fittness : function
+       calculates the percentage of fitting traces of a log.
+    fitting_batch : function
+       checks for all traces of a log at once whether they are fitting, using NumPy.
+    """
+
+    MAX_PLACES = 1 << 12 # largest model that log_fittness of library.conformance replays bit parallel, larger models are replayed with a LazyDfa
+    BATCH_WORDS = 1 << 20 # number of words of successor masks that fitting_batch combines at once, which bounds its temporary memory
+
+    def __init__(self, nfa_model):
+        """
+        Constructor of class BitParallelNfa.
+
+        Parameters
+        ----------
+        nfa_model : Nfa or CompiledNfa object
+            the model the traces are checked against, it may have epsilon transitions
+
+        Returns
+        -------
+        None.
+        """
+        model = compiled_model(nfa_model)
+        self.model = model
+        self.number_of_bytes = max((model.number_of_places + 7) // 8, 1)
+        self.number_of_words = (self.number_of_bytes + 7) // 8
+        # only the closures of the start place and the targets of transitions with an activity are needed, not the ones of all places
+        closure_masks = {}
+
+        def closure_mask(place):
+            mask = closure_masks.get(place)
+            if mask is None:
+                mask = 0
+                for closure_place in model.epsilon_closure(place):
+                    mask |= 1 << closure_place
+                closure_masks[place] = mask
+            return mask
+
+        # for each activity number the mask of the places that follow each place on the activity, epsilon moves after the activity included
+        self.__place_successors = [[0] * model.number_of_places for _ in model.activities]
+        for place in range(model.number_of_places):
+            for t in range(model.transition_offsets[place], model.transition_offsets[place + 1]):
+                activity = model.transition_activities[t]
+                if activity != CompiledNfa.EPSILON_ID:
+                    self.__place_successors[activity][place] |= closure_mask(model.transition_targets[t])
+        self.start_mask = closure_mask(model.start_place)
+        self.end_mask = 0
+        for place in model.end_places:
+            self.end_mask |= 1 << place
+        # byte tables are only built for the activities and bytes that are replayed, as most are never needed for large models
+        self.__byte_tables = [[None] * self.number_of_bytes for _ in model.activities]
+        self.__batch_tables = {} # successor masks of the activities replayed by fitting_batch as NumPy matrices
+
+    def __byte_table(self, activity, byte):
+        """
+        A helping function that builds the table of the successor masks of all 256 combinations of the places of one byte of the mask.
+        """
+        successors = self.__place_successors[activity]
+        first_place = byte * 8
+        table = [0] * 256
+        for value in range(1, 256):
+            lowest_bit = (value & -value).bit_length() - 1
+            place = first_place + lowest_bit
+            table[value] = table[value & (value - 1)] | (successors[place] if place < len(successors) else 0)
+        self.__byte_tables[activity][byte] = table
+        return table
+
+    def successor_mask(self, mask, activity):
+        """
+        This function returns the mask of the places that are active after the given activity was replayed when the places of the given mask were active.
+
+        Parameters
+        ----------
+        mask : integer
+            mask of the active places
+        activity : str
+            the activity of the event
+
+        Returns
+        -------
+        integer
+            mask of the active places after the event, 0 if the model can not replay the event.
+        """
+        activity = self.model.activity_id(activity)
+        if activity == CompiledNfa.UNKNOWN_ACTIVITY_ID:
+            return 0
+        tables = self.__byte_tables[activity]
+        successor = 0
+        for byte, value in enumerate(mask.to_bytes(self.number_of_bytes, "little")):
+            if value:
+                table = tables[byte]
+                if table is None:
+                    table = self.__byte_table(activity, byte)
+                successor |= table[value]
+        return successor
+
+    def is_trace_fitting(self, trace):
+        """
+        This function checks if the given trace matches the model.
+
+        Parameters
+        ----------
+        trace : list of str
+            activities of a trace/an instance taken from event log.
+
+        Returns
+        -------
+        bool
+            true if it matches, false otherwise.
+        """
+        mask = self.start_mask
+        for activity in trace:
+            mask = self.successor_mask(mask, activity)
+            if mask == 0:
+                return False
+        return mask & self.end_mask != 0
+
+    def log_fittness(self, log):
+        """
+        This function calculates the percentage of perfectly fitting traces in the log (list of traces).
+
+        Parameters
+        ----------
+        log : list of list of strings
+            instances/traces taken from event log.
+
+        Returns
+        -------
+        variable: float
+            the percentage of perfectly fitting traces.
+        """
+        num_fitting_traces = 0
+        for trace in log:
+            if self.is_trace_fitting(trace):
+                num_fitting_traces += 1
+        return num_fitting_traces / len(log)
+
+    def __batch_successors(self, activity):
+        """
+        A helping function that returns the successor masks of the places with a transition of the activity as NumPy matrix of 64 bit words, one row per place,
+        together with the row of each place in this matrix, -1 for the places without a transition of the activity.
+        """
+        import numpy as np
+        place_successors = self.__place_successors[activity]
+        places = [place for place, mask in enumerate(place_successors) if mask]
+        place_rows = np.full(self.number_of_words * 64, -1, dtype=np.int64)
+        place_rows[places] = np.arange(len(places))
+        successors = np.frombuffer(b"".join(place_successors[place].to_bytes(self.number_of_words * 8, "little") for place in places),
+                                   dtype='<u8').reshape(len(places), self.number_of_words)
+        self.__batch_tables[activity] = (place_rows, successors)
+        return (place_rows, successors)
+
+    def fitting_batch(self, log):
+        """
+        This function checks for all traces of the log whether they are fitting, by replaying the i-th event of all traces at the same time.
+        The active places of all traces are kept in one matrix of 64 bit words with one row per trace and each event is one table lookup per byte for all traces with the same activity.
+        NumPy is needed for this function.
+
+        Parameters
+        ----------
+        log : list of list of strings
+            instances/traces taken from event log.
+
+        Returns
+        -------
+        numpy array of bool
+            true for each fitting trace in the order of the log.
+        """
+        import numpy as np
+        number_of_words = self.number_of_words
+
+        # the activity numbers of all events, one row per trace that is padded at the end
+        lengths = np.array([len(trace) for trace in log], dtype=np.int64)
+        activity_id = self.model.activity_ids.get
+        flat_events = np.fromiter((activity_id(activity, CompiledNfa.UNKNOWN_ACTIVITY_ID) for trace in log for activity in trace),
+                                  dtype=np.int64, count=int(lengths.sum()))
+        events = np.full((len(log), int(lengths.max()) if len(log) > 0 else 0), CompiledNfa.UNKNOWN_ACTIVITY_ID, dtype=np.int64)
+        event_rows = np.repeat(np.arange(len(log)), lengths)
+        event_columns = np.arange(len(flat_events)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        events[event_rows, event_columns] = flat_events
+
+        def words(mask):
+            return np.frombuffer(mask.to_bytes(number_of_words * 8, "little"), dtype='<u8')
+
+        masks = np.tile(words(self.start_mask), (len(log), 1))
+        alive = np.ones(len(log), dtype=bool) # traces whose mask is not empty yet
+        for i in range(events.shape[1]):
+            rows = np.nonzero(alive & (lengths > i))[0]
+            activities = events[rows, i]
+            next_masks = np.zeros((len(rows), number_of_words), dtype='<u8') # unknown activities have no successor
+            for activity in np.unique(activities):
+                if activity == CompiledNfa.UNKNOWN_ACTIVITY_ID:
+                    continue
+                place_rows, successors = self.__batch_tables.get(activity) or self.__batch_successors(activity)
+                selected = np.nonzero(activities == activity)[0]
+                # the active places of each selected trace that have a transition of the activity
+                traces, places = np.nonzero(np.unpackbits(masks[rows[selected]].view(np.uint8), axis=1, bitorder="little"))
+                successor_rows = place_rows[places]
+                with_successor = successor_rows >= 0
+                traces, successor_rows = traces[with_successor], successor_rows[with_successor]
+                # the successor mask of a trace is the bitwise or of the successor masks of these places, combined a bounded number of places at a time
+                successor = np.zeros((len(selected), number_of_words), dtype='<u8')
+                step = max(1, self.BATCH_WORDS // number_of_words)
+                for start in range(0, len(traces), step):
+                    np.bitwise_or.at(successor, traces[start:start + step], successors[successor_rows[start:start + step]])
+                next_masks[selected] = successor
+            masks[rows] = next_masks
+            alive[rows] = np.any(next_masks != 0, axis=1)
+        return np.any(masks & words(self.end_mask), axis=1)
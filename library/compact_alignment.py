@@ -0,0 +1,316 @@
+from library.nfa import CompiledNfa
+from array import array
+import bisect
+import collections
+import heapq
+
+# moves the states of the alignment searches are reached with: a move on model only or a synchronous move with transition t is stored as 2 * t or 2 * t + 1
+START_MOVE = -2 # the state the search starts in, also used for states that were not reached
+LOG_ONLY_MOVE = -1
+
+
+class CompactAlignment:
+    """
+    This class stores an alignment as one integer per move instead of a list of tuples of strings.
+    Each code is the number of the activity of the move shifted left by 2 bits, combined with the kind of the move in the lowest 2 bits.
+    The activity numbers index the activities list, which is the activities list of the compiled model for all alignments of a log,
+    only alignments with log moves of activities that are not in the model get a longer copy of it.
+    The moves are decoded to the (move on trace, move on model) tuples of the other alignment functions only when they are accessed,
+    and aggregations like the deviations of an alignment are computed on the codes.
+
+    Attributes
+    ----------
+    codes : array of int
+        code of each move in the order of the alignment
+    activities : list of str
+        activity of each activity number of the codes
+
+    Methods
+    -------
+    __init__ : constructor
+       creates an alignment from its codes.
+    from_moves : function
+       encodes an alignment given as list of tuples.
+    decode : function
+       returns the (move on trace, move on model) tuple of a code.
+    number_of_moves : function
+       returns the number of moves of one kind.
+    deviations : function
+       counts the moves that are not synchronous.
+    """
+
+    __slots__ = ('codes', 'activities')
+
+    SYNCHRONOUS_MOVE = 0
+    LOG_MOVE = 1
+    MODEL_MOVE = 2
+    NO_MOVE = '>>'
+
+    def __init__(self, codes, activities):
+        """
+        Constructor of class CompactAlignment.
+
+        Parameters
+        ----------
+        codes : array of int
+            code of each move, activity number << 2 | kind of the move
+        activities : list of str
+            activity of each activity number
+
+        Returns
+        -------
+        None.
+        """
+        self.codes = codes
+        self.activities = activities
+
+    @classmethod
+    def from_moves(cls, alignment, activities=()):
+        """
+        This function encodes an alignment that is given as list of (move on trace, move on model) tuples.
+
+        Parameters
+        ----------
+        alignment : list of tuples of string
+            the moves of the alignment
+        activities : list of str
+            activities that are numbered like in this list, for example the activities of the compiled model.
+            The list is shared with the alignment as long as all activities of the alignment are in it. (Default: no activities)
+
+        Returns
+        -------
+        CompactAlignment object
+            the encoded alignment.
+        """
+        activity_ids = {activity: number for number, activity in enumerate(activities)}
+        shared_activities = activities
+        activities = list(activities)
+        codes = array('i')
+        for trace_move, model_move in alignment:
+            if trace_move == cls.NO_MOVE:
+                activity, kind = model_move, cls.MODEL_MOVE
+            else:
+                activity, kind = trace_move, cls.LOG_MOVE if model_move == cls.NO_MOVE else cls.SYNCHRONOUS_MOVE
+            number = activity_ids.get(activity)
+            if number is None:
+                number = activity_ids[activity] = len(activities)
+                activities.append(activity)
+            codes.append(number << 2 | kind)
+        if isinstance(shared_activities, list) and len(activities) == len(shared_activities):
+            activities = shared_activities
+        return cls(codes, activities)
+
+    def decode(self, code):
+        """
+        This function returns the (move on trace, move on model) tuple of a code.
+        """
+        activity = self.activities[code >> 2]
+        kind = code & 3
+        if kind == self.SYNCHRONOUS_MOVE:
+            return (activity, activity)
+        if kind == self.LOG_MOVE:
+            return (activity, self.NO_MOVE)
+        return (self.NO_MOVE, activity)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.decode(code) for code in self.codes[index]]
+        return self.decode(self.codes[index])
+
+    def __iter__(self):
+        return map(self.decode, self.codes)
+
+    def __eq__(self, other):
+        if isinstance(other, CompactAlignment):
+            return list(self) == list(other)
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) and all(move == other_move for move, other_move in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "CompactAlignment(" + repr(list(self)) + ")"
+
+    def number_of_moves(self, kind):
+        """
+        This function returns the number of moves of the given kind (SYNCHRONOUS_MOVE, LOG_MOVE or MODEL_MOVE).
+        """
+        return sum(1 for code in self.codes if code & 3 == kind)
+
+    @property
+    def cost(self):
+        """
+        The cost of the alignment, which is the number of moves that are not synchronous (epsilon moves are not part of an alignment).
+        """
+        return len(self.codes) - self.number_of_moves(self.SYNCHRONOUS_MOVE)
+
+    def deviations(self):
+        """
+        This function counts how often each move that is not synchronous occurs in the alignment.
+        The codes are counted first and only the different codes are decoded.
+
+        Returns
+        -------
+        collections.Counter
+            maps each (move on trace, move on model) tuple of a log move or model move to its number of occurrences.
+        """
+        return deviation_counts([self])
+
+
+def interned_trace_activities(activities, trace, trace_activities):
+    """
+    Function that returns the activities list of a compact alignment of a trace and the number of each event of the trace in this list.
+    It is the given activities list of the model, unless the trace has activities that are not in the model, which are then numbered after the activities of the model.
+
+    Parameters
+    ----------
+    activities : list of str
+        activities of the compiled model
+    trace : list of str
+        the trace
+    trace_activities : list of int
+        number of the activity of each event in the model, UNKNOWN_ACTIVITY_ID for activities that are not in the model
+
+    Returns
+    -------
+    activities: list of str
+        the activities list of the alignment
+    trace_activities: list of int
+        number of the activity of each event in this activities list.
+    """
+    if CompiledNfa.UNKNOWN_ACTIVITY_ID not in trace_activities:
+        return (activities, trace_activities)
+    activities = list(activities)
+    unknown_activities = {}
+    numbers = []
+    for activity, number in zip(trace, trace_activities):
+        if number == CompiledNfa.UNKNOWN_ACTIVITY_ID:
+            number = unknown_activities.get(activity)
+            if number is None:
+                number = unknown_activities[activity] = len(activities)
+                activities.append(activity)
+        numbers.append(number)
+    return (activities, numbers)
+
+
+def follow_model_moves(offsets, activities, targets, costs, moves=None):
+    """
+    Function that lowers the costs of a layer of places, one cost per place, with the moves on model only, which do not consume an event.
+    It is a dijkstra search over the places that starts with the current costs, epsilon moves have no cost and other moves on model only cost 1.
+    The transitions are given in the compressed sparse row format of CompiledNfa, so the transitions of a reversed model can be used as well.
+
+    Parameters
+    ----------
+    offsets : array of int
+        index of the first transition of each place
+    activities : array of int
+        activity number of each transition
+    targets : array of int
+        number of the end place of each transition
+    costs : list of int
+        cost of each place, infinity for places that are not reached, which is lowered in place
+    moves : list of int
+        when given, the move 2 * t of the transition t a place was reached cheaper with is stored for each such place. (Default: None)
+
+    Returns
+    -------
+    list of int
+        the reached places in the order their cost became final, which is increasing cost.
+    """
+    settled_places = []
+    frontier = [(cost, place) for place, cost in enumerate(costs) if cost != float('inf')]
+    heapq.heapify(frontier)
+    while frontier:
+        cost, place = heapq.heappop(frontier)
+        if cost > costs[place]:
+            continue # outdated entry
+        settled_places.append(place)
+        for t in range(offsets[place], offsets[place + 1]):
+            target = targets[t]
+            target_cost = cost if activities[t] == CompiledNfa.EPSILON_ID else cost + 1
+            if target_cost < costs[target]:
+                costs[target] = target_cost
+                if moves is not None:
+                    moves[target] = 2 * t
+                heapq.heappush(frontier, (target_cost, target))
+    return settled_places
+
+
+def alignment_codes(offsets, activities, move_of, place, position, trace_activities):
+    """
+    Function that goes back from a state of an alignment search to the state the search started in and returns the codes of the moves on the way,
+    in the order of the alignment. The predecessor of a state follows from the move it was reached with, so the searches only store the moves.
+
+    Parameters
+    ----------
+    offsets : array of int
+        index of the first transition of each place of the model that was searched
+    activities : array of int
+        activity number of each transition of the model
+    move_of : function
+        returns the move (START_MOVE, LOG_ONLY_MOVE, 2 * t or 2 * t + 1) a state, given as place and position in the trace, was reached with
+    place : int
+        place of the state the alignment ends in
+    position : int
+        position in the trace of the state the alignment ends in
+    trace_activities : list of int
+        activity number of each event in the activities list of the alignment, see interned_trace_activities
+
+    Returns
+    -------
+    array of int
+        the codes of the moves of the alignment.
+    """
+    codes = array('i')
+    move = move_of(place, position)
+    while move != START_MOVE:
+        if move == LOG_ONLY_MOVE:
+            position -= 1
+            codes.append(trace_activities[position] << 2 | CompactAlignment.LOG_MOVE)
+        else:
+            t = move >> 1
+            if move & 1:
+                position -= 1
+                codes.append(activities[t] << 2 | CompactAlignment.SYNCHRONOUS_MOVE)
+            elif activities[t] != CompiledNfa.EPSILON_ID:
+                codes.append(activities[t] << 2 | CompactAlignment.MODEL_MOVE)
+            # the start place of a transition is the place whose transitions include it
+            place = bisect.bisect_right(offsets, t) - 1
+        move = move_of(place, position)
+    codes.reverse()
+    return codes
+
+
+def deviation_counts(alignments):
+    """
+    Function that counts how often each move that is not synchronous occurs in the given alignments, for example the alignments of a log.
+    The codes of all alignments that share the same activities list are counted together and each different code is decoded only once.
+
+    Parameters
+    ----------
+    alignments : list of CompactAlignment objects
+        the alignments, None entries (alignments over a cost bound) are skipped
+
+    Returns
+    -------
+    collections.Counter
+        maps each (move on trace, move on model) tuple of a log move or model move to its number of occurrences in all alignments.
+    """
+    code_counts = {} # id of the activities list -> (an alignment with this list, counter of the codes)
+    for alignment in alignments:
+        if alignment is None:
+            continue
+        entry = code_counts.get(id(alignment.activities))
+        if entry is None:
+            entry = code_counts[id(alignment.activities)] = (alignment, collections.Counter())
+        entry[1].update(alignment.codes)
+    deviations = collections.Counter()
+    for alignment, counts in code_counts.values():
+        for code, count in counts.items():
+            if code & 3 != CompactAlignment.SYNCHRONOUS_MOVE:
+                deviations[alignment.decode(code)] += count
+    return deviations
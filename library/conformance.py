@@ -1,186 +1,750 @@
-from library.nfa import SpecialActivities, Nfa, Place, PlaceCombined, Transition, TransitionWithCost, trace_check, log_check
+from library.nfa import SpecialActivities, Nfa, Place, PlaceCombined, Transition, TransitionWithCost, CompiledNfa, compiled_model, trace_check, log_check
+from library.dfa import LazyDfa
+from library.bitparallel import BitParallelNfa
+from library.compact_alignment import CompactAlignment, interned_trace_activities, alignment_codes, START_MOVE, LOG_ONLY_MOVE
+from library.model_analysis import model_analysis
+from array import array
+import collections
+import concurrent.futures
+import heapq
+import time
 
-def dijkstra_has_unvisited_places(dijkstra_not_visited_places):
+def __relax(dijkstra_place_info, frontier, width, target, target_cost, predecessor, move, estimate=None):
     """
-    A helping function that checks wether the dijkstra algorithm is already done.
+    A helping function of the dijkstra algorithm that updates the info of a search state if it can be reached cheaper via the given move.
+    A search state (place, index of trace) is stored as the number place * width + index.
 
     Parameters
     ----------
-    dijkstra_not_visited_places: dictonairy
-        a dictonairy that contains a list of not seen inxedes of the trace for each place of a nfa model
+    dijkstra_place_info: dictonairy
+        maps each reached search state to its [cost, predecessor, move]
+    frontier: list
+        binary heap of the search states that still need to be explored
+    width: integer
+        number of search states per place, which is the length of the trace + 1
+    target: integer
+        the search state the move leads to
+    target_cost: integer
+        cost of the target when reached via the move
+    predecessor: integer
+        the search state the move starts in
+    move: tuple of string
+        the move that is added to the alignment, None for epsilon moves
+    estimate: function
+        lower bound of the remaining cost of a search state that is added to the priority of the target (A* search), None for dijkstra
+
+    Returns
+    -------
+    None.
+    """
+    target_info = dijkstra_place_info.get(target)
+    if target_info is None:
+        dijkstra_place_info[target] = [target_cost, predecessor, move]
+    elif target_cost < target_info[0]:
+        #update dijkstra place info because a cheaper way to a place has been found
+        target_info[0] = target_cost
+        target_info[1] = predecessor
+        target_info[2] = move
+    else:
+        return
+    place, i = divmod(target, width)
+    priority = target_cost
+    if estimate is not None:
+        priority += estimate(place, i)
+        if priority == float('inf'):
+            return # no accepting place can be reached from the target
+    heapq.heappush(frontier, (priority, place, i))
+
+__UNREACHED = 2 ** 31 - 1 # cost of states that were not reached
+
+def __relax_state(costs, moves, frontier, width, target, target_cost, move, estimate=None):
+    """
+    A helping function of the dijkstra algorithm of optimal_alignment_trace_on_nfa that updates a search state if it can be reached cheaper via the given move.
+    The costs and moves of the search states are stored in flat arrays at the number place * width + index of the state.
+
+    Parameters
+    ----------
+    costs: array of int
+        cost of each search state, __UNREACHED if it was not reached yet
+    moves: array of int
+        code of the move each search state was reached with
+    frontier: list
+        binary heap of the search states that still need to be explored
+    width: integer
+        number of search states per place, which is the length of the trace + 1
+    target: integer
+        the search state the move leads to
+    target_cost: integer
+        cost of the target when reached via the move
+    move: integer
+        the move, LOG_ONLY_MOVE or 2 * t and 2 * t + 1 for a move on model only and a synchronous move with transition t, see library.compact_alignment
+    estimate: function
+        lower bound of the remaining cost of a search state that is added to the priority of the target (A* search), None for dijkstra
+
+    Returns
+    -------
+    None.
+    """
+    if target_cost >= costs[target]:
+        return
+    costs[target] = target_cost
+    moves[target] = move
+    place, i = divmod(target, width)
+    priority = target_cost
+    if estimate is not None:
+        priority += estimate(place, i)
+        if priority == float('inf'):
+            return # no accepting place can be reached from the target
+    heapq.heappush(frontier, (priority, place, i))
+
+def __epsilon_moves_of(model, place):
+    """
+    A helping function that returns the number of epsilon transitions of a place, which are followed when its search state is expanded.
+    """
+    epsilon_moves = 0
+    for t in range(model.transition_offsets[place], model.transition_offsets[place + 1]):
+        if model.transition_activities[t] == CompiledNfa.EPSILON_ID:
+            epsilon_moves += 1
+    return epsilon_moves
+
+class AlignmentHeuristic:
+    """
+    This class holds the tables of an admissible heuristic for the A* search of optimal alignments on a nfa model.
+    The tables only depend on the model and are taken from its ModelAnalysis, so they are computed once per compiled model and reused for all traces.
+
+    Attributes
+    ----------
+    model: CompiledNfa object
+        the compiled model the tables belong to
+    reachable_activities: list of int
+        bitset of the activity numbers that can still be produced when starting in each place
+    distance_to_end: list of int
+        minimal number of moves on model only needed to reach an accepting place from each place
+
+    Methods
+    -------
+    __init__ : constructor
+       takes the tables of the given nfa model.
+    trace_estimator : function
+       returns the function that estimates the remaining cost of the search states of one trace.
+    """
+
+    def __init__(self, nfa_model):
+        """
+        Constructor of class AlignmentHeuristic that takes the tables of the given nfa model from its analysis.
+
+        Parameters
+        ----------
+        nfa_model : Nfa or CompiledNfa object
+            nfa that describes the behaviour the traces should be aligned to.
+
+        Returns
+        -------
+        None.
+        """
+        self.model = compiled_model(nfa_model)
+        analysis = model_analysis(self.model)
+        self.reachable_activities = analysis.reachable_activities
+        self.distance_to_end = analysis.distance_to_end
+
+    def trace_estimator(self, trace):
+        """
+        This function returns the lower bound of the remaining alignment cost for the search states of the given trace.
+        With events left, every remaining event whose activity can not be produced from the place any more is a move on log only.
+        At the end of the trace, the moves on model only to the closest accepting place are left.
+
+        Parameters
+        ----------
+        trace : list of strings
+            the trace that is aligned with the model
+
+        Returns
+        -------
+        estimate: function
+            maps a place number and an index of the trace to the lower bound of the remaining cost.
+        """
+        trace_bits = []
+        for activity in trace:
+            activity_id = self.model.activity_id(activity)
+            trace_bits.append(1 << activity_id if activity_id > CompiledNfa.EPSILON_ID else 0)
+        # number of not producable events in each suffix of the trace, filled on first use for each set of reachable activities
+        not_producable_suffix_events = {}
+
+        def estimate(place, i):
+            if i == len(trace):
+                return self.distance_to_end[place]
+            reachable = self.reachable_activities[place]
+            counts = not_producable_suffix_events.get(reachable)
+            if counts is None:
+                counts = [0] * (len(trace) + 1)
+                for j in range(len(trace) - 1, -1, -1):
+                    counts[j] = counts[j + 1] + (0 if trace_bits[j] & reachable else 1)
+                not_producable_suffix_events[reachable] = counts
+            return counts[i]
+
+        return estimate
+
+class SearchStatistics:
+    """
+    This class collects how much work the searches of the alignment and replay functions did, to find out why some traces take long.
+    An object is passed to the functions with the parameter statistics, which then record each search they run.
+    Without it the functions do not count anything, so the counters cost nothing when they are not needed.
+
+    Attributes
+    ----------
+    number_of_searches: integer
+        number of recorded searches, one per aligned or replayed trace (or one per log for the prefix trie alignment)
+    states_created: integer
+        number of search states that were reached
+    states_expanded: integer
+        number of search states whose moves were followed
+    queue_pushes: integer
+        number of entries added to the priority queue
+    queue_pops: integer
+        number of entries taken from the priority queue, including outdated ones
+    epsilon_moves: integer
+        number of epsilon moves that were followed
+    peak_frontier: integer
+        largest number of entries in the priority queue (largest set of active places for replay) of any search
+    elapsed_seconds: float
+        total time of all recorded searches
+    slowest_seconds: float
+        time of the slowest search
+    slowest_trace: list of strings
+        the trace of the slowest search
+    callback: function
+        called with the trace and a dictonairy of the counters of the search after each search, None if not needed
+
+    Methods
+    -------
+    __init__ : constructor
+       initializes all counters with 0.
+    record : function
+       adds the counters of one search.
+    merge : function
+       adds all counters of another statistics object, for example from a worker process.
+    """
+
+    COUNTERS = ('states_created', 'states_expanded', 'queue_pushes', 'queue_pops', 'epsilon_moves')
+
+    def __init__(self, callback=None):
+        """
+        Constructor of class SearchStatistics.
+
+        Parameters
+        ----------
+        callback : function
+            called with the trace and a dictonairy of the counters after each search. (Default: None)
+
+        Returns
+        -------
+        None.
+        """
+        self.number_of_searches = 0
+        self.states_created = 0
+        self.states_expanded = 0
+        self.queue_pushes = 0
+        self.queue_pops = 0
+        self.epsilon_moves = 0
+        self.peak_frontier = 0
+        self.elapsed_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_trace = None
+        self.callback = callback
+
+    def record(self, trace, states_created=0, states_expanded=0, queue_pushes=0, queue_pops=0, epsilon_moves=0, peak_frontier=0, elapsed_seconds=0.0):
+        """
+        This function adds the counters of one search and calls the callback.
+
+        Returns
+        -------
+        None.
+        """
+        self.number_of_searches += 1
+        self.states_created += states_created
+        self.states_expanded += states_expanded
+        self.queue_pushes += queue_pushes
+        self.queue_pops += queue_pops
+        self.epsilon_moves += epsilon_moves
+        self.peak_frontier = max(self.peak_frontier, peak_frontier)
+        self.elapsed_seconds += elapsed_seconds
+        if elapsed_seconds >= self.slowest_seconds:
+            self.slowest_seconds = elapsed_seconds
+            self.slowest_trace = trace
+        if self.callback is not None:
+            self.callback(trace, {'states_created': states_created, 'states_expanded': states_expanded, 'queue_pushes': queue_pushes,
+                                  'queue_pops': queue_pops, 'epsilon_moves': epsilon_moves, 'peak_frontier': peak_frontier,
+                                  'elapsed_seconds': elapsed_seconds})
+
+    def merge(self, other):
+        """
+        This function adds all counters of another statistics object, its callback is not called again.
+
+        Returns
+        -------
+        None.
+        """
+        self.number_of_searches += other.number_of_searches
+        for counter in self.COUNTERS:
+            setattr(self, counter, getattr(self, counter) + getattr(other, counter))
+        self.peak_frontier = max(self.peak_frontier, other.peak_frontier)
+        self.elapsed_seconds += other.elapsed_seconds
+        if other.slowest_trace is not None and other.slowest_seconds >= self.slowest_seconds:
+            self.slowest_seconds = other.slowest_seconds
+            self.slowest_trace = other.slowest_trace
+
+def trace_variants(log):
+    """
+    This function groups the traces of a log by their sequence of activities (the trace variant).
+
+    Parameters
+    ----------
+    log : list of list of string
+        the log that contains the traces
     
     Returns
     -------
-    bool
-        true if there are still places for the dijkstra algorithm to explore, false otherwise.
+    variants: dictonairy
+        maps each variant as tuple of string to the positions of its traces in the log, the variants are in the order they first occur in the log.
+    """
+    variants = {}
+    for position, trace in enumerate(log):
+        variant = tuple(trace)
+        if variant in variants:
+            variants[variant].append(position)
+        else:
+            variants[variant] = [position]
+    return variants
+
+# model and heuristic of a worker process of the parallel log alignment, they are set once when the worker starts
+__worker_context = {}
+
+def __init_alignment_worker(nfa_model, heuristic, max_cost, with_statistics, compact):
+    """
+    A helping function that runs once in each worker process of the parallel log alignment and keeps the model for all tasks of the worker.
+    """
+    if heuristic is True:
+        heuristic = AlignmentHeuristic(nfa_model)
+    __worker_context['model'] = nfa_model
+    __worker_context['heuristic'] = heuristic
+    __worker_context['max_cost'] = max_cost
+    __worker_context['with_statistics'] = with_statistics
+    __worker_context['compact'] = compact
+
+def __align_chunk(chunk):
+    """
+    A helping function that aligns a chunk of (position, trace) pairs in a worker process and returns the (position, result) pairs
+    and the statistics of the searches of the chunk, or None if no statistics are collected.
+    """
+    statistics = SearchStatistics() if __worker_context['with_statistics'] else None
+    return ([(position, optimal_alignment_trace_on_nfa(__worker_context['model'], trace, __worker_context['heuristic'], __worker_context['max_cost'], statistics,
+                                                              __worker_context['compact']))
+             for position, trace in chunk], statistics)
+
+def __balanced_chunks(traces, number_of_chunks):
+    """
+    A helping function that distributes the traces over the given number of chunks so that all chunks have about the same total trace length.
+    The longest traces are distributed first, each to the chunk with the smallest total length so far.
+
+    Parameters
+    ----------
+    traces : list of list of string
+        the traces that should be distributed
+    number_of_chunks : integer
+        the maximal number of chunks
+
+    Returns
+    -------
+    chunks: list of list of tuples
+        (position of the trace in traces, trace) pairs for each not empty chunk, the longest chunks come first.
+    """
+    chunk_sizes = [(0, chunk) for chunk in range(min(number_of_chunks, len(traces)))]
+    chunks = [[] for _ in chunk_sizes]
+    for position in sorted(range(len(traces)), key=lambda position: len(traces[position]), reverse=True):
+        size, chunk = heapq.heappop(chunk_sizes)
+        chunks[chunk].append((position, traces[position]))
+        heapq.heappush(chunk_sizes, (size + len(traces[position]) + 1, chunk))
+    return chunks
+
+def optimal_alignment_variants_on_nfa(nfa_model, log, heuristic=None, workers=None, max_cost=None, statistics=None, compact=False):
+    """
+    This function computes the optimal alignment only once for each trace variant of the log.
+    As real logs mostly consist of a few variants, this is much faster than aligning every trace.
+
+    Parameters
+    ----------
+    nfa_model : Nfa or CompiledNfa object
+        nfa that describes the behaviour the trace should be aligned to.
+    log : list of list of string
+        the log that contains all the traces that should be aligned with the model
+    heuristic : AlignmentHeuristic object or bool
+        when given, A* search is used instead of dijkstra. True computes the heuristic tables once for the whole log. (Default: None)
+    workers : integer
+        number of processes that align the variants in parallel, None or 1 aligns them in this process. (Default: None)
+    max_cost : integer
+        when given, the search for a variant stops as soon as its alignment would cost more, see optimal_alignment_trace_on_nfa. (Default: None)
+    statistics : SearchStatistics object
+        records the work of the search of each variant, its callback is only called for variants aligned in this process. (Default: None)
+    compact : bool
+        returns the alignments as CompactAlignment objects, see optimal_alignment_trace_on_nfa. (Default: False)
+    
+    Returns
+    -------
+    variant_alignments: list of tuples
+        (variant, number of traces of the variant, (alignment, cost_alignment)) for each variant in the order they first occur in the log.
+    """
+    nfa_model = compiled_model(nfa_model) # compiled once for the whole log
+    variants = trace_variants(log)
+    traces = [list(variant) for variant in variants]
+    if workers is not None and workers > 1 and len(traces) > 1:
+        # the model is sent to each worker once, the traces are sent in chunks of about the same total length,
+        # a few chunks per worker so that a worker that is done early can take over remaining chunks
+        results = [None] * len(traces)
+        with concurrent.futures.ProcessPoolExecutor(workers, initializer=__init_alignment_worker, initargs=(nfa_model, heuristic, max_cost, statistics is not None, compact)) as executor:
+            for chunk_results, chunk_statistics in executor.map(__align_chunk, __balanced_chunks(traces, workers * 4)):
+                for position, result in chunk_results:
+                    results[position] = result
+                if statistics is not None:
+                    statistics.merge(chunk_statistics)
+    else:
+        if heuristic is True:
+            heuristic = AlignmentHeuristic(nfa_model)
+        results = [optimal_alignment_trace_on_nfa(nfa_model, trace, heuristic, max_cost, statistics, compact) for trace in traces]
+    return [(trace, len(positions), result) for trace, positions, result in zip(traces, variants.values(), results)]
+
+def __independent_result(result):
+    """
+    A helping function that gives the result of one trace of a variant its own alignment list, so changing the alignment of one trace does not change the ones of the other traces.
+    CompactAlignment objects are not changed by any function and are shared by all traces of the variant.
+    """
+    alignment, cost = result
+    if isinstance(alignment, list):
+        return (list(alignment), cost)
+    return result
+
+def __result_without_alignment(model, max_cost):
+    """
+    A helping function that returns the result of a search that did not find an alignment within the bound.
+    Moves on log only are always possible, so an alignment exists exactly when an accepting place can be reached from the start place.
+    If it exists, only the bound stopped the search and the result is (None, max_cost + 1), otherwise it is (None, None).
+    """
+    if max_cost is None or model_analysis(model).distance_to_end[model.start_place] == float('inf'):
+        return (None, None)
+    return (None, max_cost + 1)
+
+def optimal_alignment_prefix_trie_on_nfa(nfa_model, log, max_cost=None, statistics=None, compact=False):
     """
-    for dejure_place in dijkstra_not_visited_places:
-        if(len(dijkstra_not_visited_places[dejure_place]) > 0):
-            return True
-    return False
+    This function aligns all traces of a log with one dijkstra search instead of one search per trace.
+    The traces are inserted into a prefix trie and the search runs on the combination of the trie nodes and the places of the model,
+    so the work for a prefix that several traces share is done only once.
 
-def optimal_alignment_log_on_nfa(nfa_model, log):
+    Parameters
+    ----------
+    nfa_model : Nfa or CompiledNfa object
+        nfa that describes the behaviour the traces should be aligned to.
+    log : list of list of string
+        the log that contains all the traces that should be aligned with the model
+    max_cost : integer
+        when given, the search stops as soon as all remaining alignments would cost more, their result is (None, max_cost + 1). (Default: None)
+    statistics : SearchStatistics object
+        records the work of the search, which is one search for the whole log. (Default: None)
+    compact : bool
+        returns the alignments as CompactAlignment objects, see optimal_alignment_trace_on_nfa. (Default: False)
+    
+    Returns
+    -------
+    alignments: list of tuples
+        (alignment, cost_alignment) for each trace of the log in the order of the log, each trace with the same activities gets a copy of the alignment list.
+    """
+    model = compiled_model(nfa_model)
+    variants = trace_variants(log)
+    input_log_check_flag = log_check([list(variant) for variant in variants])
+    if not input_log_check_flag:
+        exit()
+
+    # prefix trie of the trace variants, node 0 is the empty prefix
+    trie_children = [{}] # for each node: activity -> child node
+    variant_of_node = {} # the node each variant ends in
+    for index, variant in enumerate(variants):
+        node = 0
+        for activity in variant:
+            child = trie_children[node].get(activity)
+            if child is None:
+                child = len(trie_children)
+                trie_children.append({})
+                trie_children[node][activity] = child
+            node = child
+        variant_of_node[node] = index
+
+    # search states (trie node, dejure place) are numbered node * number of places + place
+    width = model.number_of_places
+    start_state = model.start_place
+    dijkstra_place_info = {start_state: [0, None, None]}
+    visited = set()
+    frontier = [(0, 0, model.start_place)]
+    closest_accepting_places = [None] * len(variants)
+    not_aligned_variants = len(variants)
+    if statistics is not None:
+        start_time = time.perf_counter()
+        queue_pops = epsilon_moves = peak_frontier = 0
+
+    while frontier and not_aligned_variants > 0:
+        if statistics is not None:
+            queue_pops += 1
+            if len(frontier) > peak_frontier:
+                peak_frontier = len(frontier)
+        current_place_cost, node, dejure_place = heapq.heappop(frontier)
+        if max_cost is not None and current_place_cost > max_cost:
+            # the variants that are not aligned yet all cost more than the bound
+            break
+        current_place = node * width + dejure_place
+        if current_place in visited:
+            continue
+        visited.add(current_place)
+        if statistics is not None:
+            epsilon_moves += __epsilon_moves_of(model, dejure_place)
+        if model.is_end_place[dejure_place] and node in variant_of_node and closest_accepting_places[variant_of_node[node]] is None:
+            # the states are explored by increasing cost, so this is the closest accepting place for the variant ending in the node
+            closest_accepting_places[variant_of_node[node]] = current_place
+            not_aligned_variants -= 1
+
+        #- move on log only, for each activity that follows the prefix in any trace
+        for activity, child in trie_children[node].items():
+            __relax(dijkstra_place_info, frontier, width, child * width + dejure_place, current_place_cost + 1, current_place, (activity, '>>'))
+        #- move on model only and synchronous moves
+        for t in range(model.transition_offsets[dejure_place], model.transition_offsets[dejure_place + 1]):
+            target = model.transition_targets[t]
+            activity = model.activities[model.transition_activities[t]]
+            if model.transition_activities[t] == CompiledNfa.EPSILON_ID:
+                __relax(dijkstra_place_info, frontier, width, node * width + target, current_place_cost, current_place, None)
+                continue
+            __relax(dijkstra_place_info, frontier, width, node * width + target, current_place_cost + 1, current_place, ('>>', activity))
+            child = trie_children[node].get(activity)
+            if child is not None:
+                __relax(dijkstra_place_info, frontier, width, child * width + target, current_place_cost, current_place, (activity, activity))
+
+    if statistics is not None:
+        statistics.record(None, len(dijkstra_place_info), len(visited), queue_pops + len(frontier), queue_pops, epsilon_moves, peak_frontier,
+                          time.perf_counter() - start_time)
+
+    # recreate the path of each variant, it only passes trie nodes of prefixes of the variant
+    results = []
+    for closest_accepting_place in closest_accepting_places:
+        if closest_accepting_place is None:
+            results.append(__result_without_alignment(model, max_cost))
+            continue
+        alignment = []
+        place_we_are_at = closest_accepting_place
+        while place_we_are_at != start_state:
+            if(dijkstra_place_info[place_we_are_at][2] != None):
+                alignment.append(dijkstra_place_info[place_we_are_at][2])
+            place_we_are_at = dijkstra_place_info[place_we_are_at][1]
+        alignment.reverse()
+        if compact:
+            alignment = CompactAlignment.from_moves(alignment, model.activities)
+        results.append((alignment, dijkstra_place_info[closest_accepting_place][0]))
+
+    alignments = [None] * len(log)
+    for positions, result in zip(variants.values(), results):
+        for position in positions:
+            alignments[position] = __independent_result(result)
+    return alignments
+
+def optimal_alignment_log_on_nfa(nfa_model, log, heuristic=None, workers=None, shared_prefixes=False, max_cost=None, statistics=None, compact=False):
     """
     This function performs dijkstra algorithm on the nfa model and each trace of the log to find the optimal alignment for each trace.
+    The alignment is computed once per trace variant, each trace with the same activities gets a copy of its alignment list.
 
     Parameters
     ----------
-    nfa_model : Nfa object
+    nfa_model : Nfa or CompiledNfa object
         nfa that describes the behaviour the trace should be aligned to.
     log : list of list of string
         the log that contains all the traces that should be aligned with the model
+    heuristic : AlignmentHeuristic object or bool
+        when given, A* search is used instead of dijkstra. True computes the heuristic tables once for the whole log. (Default: None)
+    workers : integer
+        number of processes that align the traces in parallel, None or 1 aligns them in this process. (Default: None)
+    shared_prefixes : bool
+        aligns all traces with one search on a prefix trie of the log (see optimal_alignment_prefix_trie_on_nfa), heuristic and workers are not used then. (Default: False)
+    max_cost : integer
+        when given, traces whose alignment would cost more are not aligned completely and their result is (None, max_cost + 1). (Default: None)
+    statistics : SearchStatistics object
+        records the work of the searches, one per trace variant. (Default: None)
+    compact : bool
+        returns the alignments as CompactAlignment objects, which need far less memory for large logs, see optimal_alignment_trace_on_nfa. (Default: False)
     
     Returns
     -------
-    alignment: list of tuples of string
+    alignment: list of tuples of string or CompactAlignment object
         The first item of the tuple is move on trace and the second is move on model.
     cost_alignment: integer
         number of not synchronized moves.
     """
-    alignments = []
-    for trace in log:
-        alignments.append(optimal_alignment_trace_on_nfa(nfa_model, trace))
+    if shared_prefixes:
+        return optimal_alignment_prefix_trie_on_nfa(nfa_model, log, max_cost, statistics, compact)
+    alignments = [None] * len(log)
+    variants = trace_variants(log)
+    for variant, _, alignment in optimal_alignment_variants_on_nfa(nfa_model, list(variants), heuristic, workers, max_cost, statistics, compact):
+        for position in variants[tuple(variant)]:
+            alignments[position] = __independent_result(alignment)
     return alignments
 
-def optimal_alignment_trace_on_nfa(nfa_model, trace):
+def optimal_alignment_trace_on_nfa(nfa_model, trace, heuristic=None, max_cost=None, statistics=None, compact=False):
     """
     This function performs dijkstra algorithm on the nfa model and the trace to find the optimal alignment.
+    When a heuristic is given, A* search is used instead which expands far less search states for well fitting traces.
 
     Parameters
     ----------
-    nfa_model : Nfa object
+    nfa_model : Nfa or CompiledNfa object
         nfa that describes the behaviour the trace should be aligned to.
     
     trace : list of strings
         the trace that should be aligned with the model
+
+    heuristic : AlignmentHeuristic object or bool
+        the precomputed heuristic tables of the nfa model, True computes them just for this trace. (Default: None)
+
+    max_cost : integer
+        when given, the search stops as soon as every alignment that was not found yet costs more than max_cost,
+        which makes it cheap to sort out badly deviating traces. Their result is (None, max_cost + 1). (Default: None)
+
+    statistics : SearchStatistics object
+        records the work of the search. (Default: None)
+
+    compact : bool
+        returns the alignment as CompactAlignment, which stores one integer per move and decodes the moves only when they are accessed. (Default: False)
     
     Returns
     -------
-    alignment: list of tuples of string
-        The first item of the tuple is move on trace and the second is move on model.
+    alignment: list of tuples of string or CompactAlignment object
+        The first item of the tuple is move on trace and the second is move on model, None if the cost of the alignment is higher than max_cost
+        or the model can not reach an accepting place.
     cost_alignment: integer
-        number of not synchronized moves.
+        number of not synchronized moves, max_cost + 1 if it is higher than max_cost, None if the model can not reach an accepting place.
     """
     input_trace_check_flag = trace_check(trace)
     if not input_trace_check_flag:
         exit()
-    infinity = float('inf') # xxx optimize as floats are big in memory
-    #initialize
-    dijkstra_place_info = {}
-    dijkstra_not_visited_places = {} 
-
-    for place in nfa_model.places:
-        #no places visited yet
-        dijkstra_not_visited_places[place] = []
-        for i in range(len(trace) + 1):
-            dijkstra_not_visited_places[place].append(i)
-
-        #fill the place info
-        for i in range(len(trace)+1): #here the +1 is needed because the index len(trace) represents the end state of the implicit trace nfa
-            dijkstra_place_info[(place, i)] = [infinity, None, None] # Format: [cost, predecessor, (ModelMove, LogMove)] - more memory efficient than dict
-    #initial cost for start place is 0
-    dijkstra_place_info[(nfa_model.start_place, 0)][0] = 0
-
-    #xxx current by old method
-    old_not_visited_places = []
-    for place in nfa_model.places:
-        for i in range(len(trace) + 1):
-            old_not_visited_places.append((place, i))
-
-    while (dijkstra_has_unvisited_places(dijkstra_not_visited_places)):
-
-        #select current place (dejureplace and index of trace) that has the lowest cost and was not yet visited
-        current_place = None
-        current_place_cost = infinity
-        current_place_trace_move = None
-        for dejure_place in dijkstra_not_visited_places:
-                for i in dijkstra_not_visited_places[dejure_place]:
-                    if(dijkstra_place_info[(dejure_place, i)][0] < current_place_cost): #lower cost
-                        current_place = (dejure_place, i)
-                        current_place_cost = dijkstra_place_info[current_place][0]
-                        current_place_trace_move = None
-                        if(i < len(trace)):
-                            current_place_trace_move = trace[i]
-
-        #xxx check wether current_place cost is lower than infinity because otherwise not connected nfa
+    model = compiled_model(nfa_model)
+    if heuristic is True:
+        heuristic = AlignmentHeuristic(model)
+    estimate = None
+    if heuristic is not None:
+        estimate = heuristic.trace_estimator(trace)
+    trace_activities = [model.activity_id(activity) for activity in trace]
+    transition_offsets = model.transition_offsets
+    transition_activities = model.transition_activities
+    transition_targets = model.transition_targets
+    width = len(trace) + 1 #here the +1 is needed because the index len(trace) represents the end state of the implicit trace nfa
+
+    # search states (dejure place, index of trace) are numbered place * width + index
+    # and their cost and the move they were reached with are stored in flat arrays at this number, see __relax_state
+    start_state = model.start_place * width
+    costs = array('i', [__UNREACHED]) * (model.number_of_places * width)
+    moves = array('i', [START_MOVE]) * (model.number_of_places * width)
+    visited = bytearray(model.number_of_places * width)
+    costs[start_state] = 0
+    # the frontier is a binary heap of (priority, place, index of trace); outdated entries are skipped when popped
+    # the priority is the cost of the state, for A* search plus the estimated remaining cost
+    # as the places are numbered in the order of the model, ties between equally cheap states are broken like a scan over all places and indexes
+    frontier = [(0, model.start_place, 0)]
+    accepting_cost = None
+    closest_accepting_place = None
+    if statistics is not None:
+        start_time = time.perf_counter()
+        queue_pops = epsilon_moves = peak_frontier = 0
+
+    while frontier:
+        if statistics is not None:
+            queue_pops += 1
+            if len(frontier) > peak_frontier:
+                peak_frontier = len(frontier)
+        priority, dejure_place, i = heapq.heappop(frontier)
+        if accepting_cost is not None and priority > accepting_cost:
+            # all states that are as cheap as the first accepting state are settled
+            break
+        if max_cost is not None and priority > max_cost:
+            # the priority never underestimates the cost of an alignment through this state, so no alignment within the bound is left
+            break
+        current_place = dejure_place * width + i
+        if visited[current_place]:
+            continue
+        visited[current_place] = 1
+        if statistics is not None:
+            epsilon_moves += __epsilon_moves_of(model, dejure_place)
+        current_place_cost = costs[current_place]
+        if i == len(trace) and model.is_end_place[dejure_place]:
+            if estimate is not None:
+                # the heuristic is consistent, so the first accepting state that is explored is an optimal one
+                closest_accepting_place = current_place
+                break
+            if accepting_cost is None:
+                accepting_cost = current_place_cost
+        current_place_trace_activity = None
+        if i < len(trace):
+            current_place_trace_activity = trace_activities[i]
 
         #check for all transitions if other places can be reached cheaper
         #- move on log only
-        if(current_place[1] < len(trace)):
-            log_move_target = (current_place[0], current_place[1]+1)
-            log_move_target_cost_via_current_place = dijkstra_place_info[current_place][0] + 1 #the cost of a move on log only is 1
-            if(log_move_target_cost_via_current_place < dijkstra_place_info[log_move_target][0]):
-                #update dijkstra place info because a cheaper way to a place has been found
-                dijkstra_place_info[log_move_target][0] = log_move_target_cost_via_current_place #cost
-                dijkstra_place_info[log_move_target][1] = current_place #predecessor
-                dijkstra_place_info[log_move_target][2] = (current_place_trace_move, '>>')
-                #print("used: ", (current_place_trace_move, '>>'), " to go from ", (current_place[0].label, current_place[1]), " to ",  (log_move_target[0].label, log_move_target[1]), "with cost: ", log_move_target_cost_via_current_place)
+        if i < len(trace):
+            __relax_state(costs, moves, frontier, width, current_place + 1, current_place_cost + 1, LOG_ONLY_MOVE, estimate) #the cost of a move on log only is 1
         #- move on model only and synchronous moves
-        for trans in current_place[0].transitions:
-            dejure_transition_target = trans.end_place
+        for t in range(transition_offsets[dejure_place], transition_offsets[dejure_place + 1]):
+            model_move_target = transition_targets[t] * width + i
+            activity = transition_activities[t]
             #- move on model only
-            model_move_target = (dejure_transition_target, current_place[1])
-            model_move_target_cost_via_current_place = dijkstra_place_info[current_place][0] + 1  #the cost of a move on model only is 1
-            if(trans.activity == SpecialActivities.EPSILON):
-                model_move_target_cost_via_current_place = dijkstra_place_info[current_place][0]  #the cost of a epsilon move on model only is 0
-            if(model_move_target_cost_via_current_place < dijkstra_place_info[model_move_target][0]):
-                #update dijkstra place info because a cheaper way to a place has been found
-                if(trans.activity == SpecialActivities.EPSILON):
-                    dijkstra_place_info[model_move_target][0] = model_move_target_cost_via_current_place
-                    dijkstra_place_info[model_move_target][1] = current_place #predecessor
-                    dijkstra_place_info[model_move_target][2] = None #epsilon moves should not appear in the alignment
-                    #print("used: N ", ('>>', trans.activity), " to go from ", (current_place[0].label, current_place[1]), " to ",  (model_move_target[0].label, model_move_target[1]), "with cost: ", model_move_target_cost_via_current_place)
-                else:
-                    dijkstra_place_info[model_move_target][0] = model_move_target_cost_via_current_place #cost
-                    dijkstra_place_info[model_move_target][1] = current_place #predecessor
-                    dijkstra_place_info[model_move_target][2] = ('>>', trans.activity)
-                    #print("used: ", ('>>', trans.activity), " to go from ", (current_place[0].label, current_place[1]), " to ",  (model_move_target[0].label, model_move_target[1]), "with cost: ", model_move_target_cost_via_current_place)
+            if activity == CompiledNfa.EPSILON_ID:
+                #the cost of a epsilon move on model only is 0 and epsilon moves should not appear in the alignment
+                __relax_state(costs, moves, frontier, width, model_move_target, current_place_cost, 2 * t, estimate)
+            else:
+                __relax_state(costs, moves, frontier, width, model_move_target, current_place_cost + 1, 2 * t, estimate) #the cost of a move on model only is 1
             #- synchrounous move
-            if(current_place[1] < len(trace)):
-                if(trans.activity == current_place_trace_move):
-                    sync_move_target = (dejure_transition_target, current_place[1]+1)
-                    sync_move_target_cost_via_current_place = dijkstra_place_info[current_place][0] #synchronous moves have no cost associated to them
-                    if(sync_move_target_cost_via_current_place < dijkstra_place_info[sync_move_target][0]):
-                        #update dijkstra place info because a cheaper way to a place has been found
-                        dijkstra_place_info[sync_move_target][0] = sync_move_target_cost_via_current_place #cost
-                        dijkstra_place_info[sync_move_target][1] = current_place #predecessor
-                        dijkstra_place_info[sync_move_target][2] = (trans.activity, current_place_trace_move)
-                        #print("used: ", (trans.activity, current_place_trace_move), " to go from ", (current_place[0].label, current_place[1]), " to ",  (sync_move_target[0].label, sync_move_target[1]), "with cost: ", sync_move_target_cost_via_current_place)
-
-        #remove the current selected place from list of not visited places
-        dijkstra_not_visited_places[current_place[0]].remove(current_place[1])
-    
+            if activity == current_place_trace_activity:
+                #synchronous moves have no cost associated to them
+                __relax_state(costs, moves, frontier, width, model_move_target + 1, current_place_cost, 2 * t + 1, estimate)
+
+    if statistics is not None:
+        statistics.record(trace, len(costs) - costs.count(__UNREACHED), len(visited) - visited.count(0), queue_pops + len(frontier), queue_pops,
+                          epsilon_moves, peak_frontier, time.perf_counter() - start_time)
+
     #return the alignments along the cheapest path to an accepting place
     #find closest accepting place
-    closest_accepting_place = (nfa_model.end_places[0], len(trace)) # xxx there must be an end place in dejure nfa
-    cost_to_closest_acc_place = dijkstra_place_info[closest_accepting_place][0]
-    for dejure_end_place in nfa_model.end_places:
-        if(dijkstra_place_info[(dejure_end_place, len(trace))][0] < cost_to_closest_acc_place):
-            closest_accepting_place = (dejure_end_place, len(trace))
-            cost_to_closest_acc_place = dijkstra_place_info[closest_accepting_place][0]
+    if closest_accepting_place is None and accepting_cost is None:
+        return __result_without_alignment(model, max_cost) # the bound was exceeded or no accepting place can be reached
+    if closest_accepting_place is None:
+        closest_accepting_place = model.end_places[0] * width + len(trace)
+        for dejure_end_place in model.end_places:
+            if costs[dejure_end_place * width + len(trace)] < costs[closest_accepting_place]:
+                closest_accepting_place = dejure_end_place * width + len(trace)
+    cost_alignment = costs[closest_accepting_place]
 
     # recreate the path to closest accepting place by going back from closest accepting place to the start place
-    alignment = []
-    place_we_are_at = closest_accepting_place
-    cost_alignment = cost_to_closest_acc_place
-    while place_we_are_at != (nfa_model.start_place, 0):
-        if(dijkstra_place_info[place_we_are_at][2] != None):
-            alignment.insert(0, dijkstra_place_info[place_we_are_at][2]) #insert move that was used to get from predecessor to place we are at
-        place_we_are_at = dijkstra_place_info[place_we_are_at][1] #set predecessor to place we are at
-    
+    # the predecessor of a state follows from the move it was reached with, so it does not need to be stored
+    # the moves are collected as codes of a CompactAlignment, which are only decoded to tuples if no compact result is wanted
+    activities, trace_activities = interned_trace_activities(model.activities, trace, trace_activities)
+    codes = alignment_codes(transition_offsets, transition_activities, lambda place, i: moves[place * width + i], closest_accepting_place // width, len(trace), trace_activities)
+    alignment = CompactAlignment(codes, activities)
+    if not compact:
+        alignment = list(alignment)
+
     return (alignment, cost_alignment)
 
-def is_trace_fitting(nfa_model, trace):
+def is_trace_fitting(nfa_model, trace, statistics=None):
 
     """
     This function checks if the given trace matches the model. It replays the trace on the model and checks whether it ends up in an accepting end state.
+    All places the model can be in are tracked at once, so each event is replayed only one time and no recursion is needed.
 
     Parameters
     ----------
-    nfa_model : NFA object
-        An Nfa describing the wanted behavior, the trace should be aligned to.
+    nfa_model : NFA or CompiledNfa object
+        An Nfa describing the wanted behavior, the trace should be aligned to. The epsilon closures of a CompiledNfa are reused for all traces replayed on it.
     trace : list of str
         activities of a trace/an instance taken from event log.
+    statistics : SearchStatistics object
+        records the work of the replay, each active place counts as a created state and the largest set of active places as the peak frontier. (Default: None)
     
     Returns
     -------
@@ -190,81 +754,59 @@ def is_trace_fitting(nfa_model, trace):
     """
 
     # trace is here just a list of activities
-    # check input
+    model = compiled_model(nfa_model)
+    if statistics is not None:
+        start_time = time.perf_counter()
+        states_created = states_expanded = peak_frontier = 0
+        epsilon_moves = len(model.epsilon_closure(model.start_place)) - 1
+    # all places that can be reached with the already replayed part of the trace
+    active_places = set(model.epsilon_closure(model.start_place))
+    fitting = None
+    for activity in trace:
+        if statistics is not None:
+            states_created += len(active_places)
+            states_expanded += len(active_places)
+            peak_frontier = max(peak_frontier, len(active_places))
+        activity = model.activity_id(activity)
+        next_active_places = model.successor_places(active_places, activity)
+        if statistics is not None:
+            # the places that are not reached by a transition of the activity itself are reached by epsilon moves
+            epsilon_moves += len(next_active_places) - len({model.transition_targets[t] for place in active_places
+                                                            for t in range(model.transition_offsets[place], model.transition_offsets[place + 1])
+                                                            if model.transition_activities[t] == activity})
+        if len(next_active_places) == 0:
+            fitting = False
+            break
+        active_places = next_active_places
 
-    if (len(trace) == 0):
-        if nfa_model.start_place in nfa_model.end_places:
-            return True
-        # check only for epsilon transitions
-        for trans in nfa_model.start_place.transitions:
-            if trans.activity == SpecialActivities.EPSILON:
-                if (__is_subtrace_fitting(nfa_model, trans.end_place, trace[0:]) == True):
-                    return True
-        return False
+    if fitting is None:
+        fitting = False
+        for place in active_places:
+            if model.is_end_place[place]:
+                fitting = True
+                break
+        if statistics is not None:
+            states_created += len(active_places)
+            peak_frontier = max(peak_frontier, len(active_places))
+    if statistics is not None:
+        statistics.record(trace, states_created, states_expanded, epsilon_moves=epsilon_moves, peak_frontier=peak_frontier,
+                          elapsed_seconds=time.perf_counter() - start_time)
+    return fitting
 
-    activity = trace[0]
-    for trans in nfa_model.start_place.transitions:
-        if trans.activity == activity:
-            if (__is_subtrace_fitting(nfa_model, trans.end_place, trace[1:]) == True):
-                return True
-        if trans.activity == SpecialActivities.EPSILON:
-            if (__is_subtrace_fitting(nfa_model, trans.end_place, trace[0:]) == True):
-                return True
-
-    return False
-
-def __is_subtrace_fitting(nfa_model, current_place, trace):
-    """
-    A helping function that checks if the given trace ends up in an accepting end state when started from the current place.
-
-    Parameters
-    ----------
-    nfa_model : NFA object
-        An Nfa describing the wanted behavior, the trace should be aligned to.
-    currrent_place: Place object
-        place in NFA model that should be used as the initial place to start replaying the trace from
-    trace : list of str
-        activities of a trace/an instance taken from event log
-    
-    Returns
-    -------
-    bool
-        true if it matches, false otherwise.
-    """
-    # trace is here just a list of activities
-    # check input
-
-    if (len(trace) == 0):
-        if current_place in nfa_model.end_places:
-            return True
-        # check only for epsilon transitions
-        for trans in current_place.transitions:
-            if trans.activity == SpecialActivities.EPSILON:
-                if (__is_subtrace_fitting(nfa_model, trans.end_place, trace[0:]) == True):
-                    return True
-        return False
-
-    activity = trace[0]
-    for trans in current_place.transitions:
-        if trans.activity == activity:
-            if (__is_subtrace_fitting(nfa_model, trans.end_place, trace[1:]) == True):
-                return True
-        if trans.activity == SpecialActivities.EPSILON:
-            if (__is_subtrace_fitting(nfa_model, trans.end_place, trace[0:]) == True):
-                return True
-
-    return False
-
-def log_fittness(nfa_model, log):
+def log_fittness(nfa_model, log, bit_parallel=False):
     """
     This function calculates the percentage of perfectly fitting traces in the log (list of traces) when replayed on the NFA model.
 
     Parameters
     ----------
-    nfa_model : NFA object
+    nfa_model : NFA or CompiledNfa object
         An Nfa describing the wanted behavior, the trace should be aligned to.
     log : list of list of strings
         instances/traces taken from event log.
+    bit_parallel : bool
+        replays all trace variants at once as bit masks with NumPy (see BitParallelNfa.fitting_batch) instead of determinizing the model,
+        which can be faster when the traces reach many different sets of places of a model with up to a few thousand places.
+        Models with more than BitParallelNfa.MAX_PLACES places are always replayed with the LazyDfa, which is faster for them. (Default: False)
     
     Returns
     -------
@@ -273,11 +815,185 @@ def log_fittness(nfa_model, log):
     """
     # Check for each trace in the log wether the trace is fiting (replayable)
     # return the fraction of traces that are fiting (replayable)
-    input_log_check_flag = log_check(log)
+    # each trace variant is checked and replayed only once
+    variants = trace_variants(log)
+    input_log_check_flag = log_check([list(variant) for variant in variants])
     if not input_log_check_flag:
         exit()
+    nfa_model = compiled_model(nfa_model)
+    if bit_parallel and nfa_model.number_of_places <= BitParallelNfa.MAX_PLACES:
+        fitting = BitParallelNfa(nfa_model).fitting_batch(list(variants))
+        return sum(len(positions) for positions, fitting_variant in zip(variants.values(), fitting) if fitting_variant) / len(log)
     num_fitting_traces = 0
-    for trace in log:
-        if (is_trace_fitting(nfa_model, trace)):
-            num_fitting_traces += 1
+    lazy_dfa = LazyDfa(nfa_model) # the sets of places reached by the traces are determinized once and shared by all traces of the log
+    for variant, positions in variants.items():
+        if (lazy_dfa.is_trace_fitting(variant)):
+            num_fitting_traces += len(positions)
     return (num_fitting_traces / len(log))
+
+class ConformanceSummary:
+    """
+    This class keeps running aggregates over the traces of a log that is checked one trace at a time, so the log never has to be kept in memory.
+
+    Attributes
+    ----------
+    number_of_traces: integer
+        number of traces seen so far
+    number_of_fitting_traces: integer
+        number of perfectly fitting traces seen so far
+    total_cost: integer
+        sum of the alignment costs seen so far, only updated by alignments
+    max_cost: integer
+        highest alignment cost seen so far, only updated by alignments
+    number_of_traces_over_bound: integer
+        number of traces whose alignment cost more than the bound of a cost bounded alignment, they are not part of total_cost and max_cost
+    number_of_traces_without_alignment: integer
+        number of traces that have no alignment because the model can not reach an accepting place, they are not part of total_cost and max_cost either
+
+    Methods
+    -------
+    __init__ : constructor
+       initializes all aggregates with 0.
+    add : function
+       adds the result of one trace to the aggregates.
+    """
+
+    def __init__(self):
+        """
+        Constructor of class ConformanceSummary.
+
+        Returns
+        -------
+        None.
+        """
+        self.number_of_traces = 0
+        self.number_of_fitting_traces = 0
+        self.total_cost = 0
+        self.max_cost = 0
+        self.number_of_traces_over_bound = 0
+        self.number_of_traces_without_alignment = 0
+
+    def add(self, fitting, cost=None, over_bound=False, without_alignment=False):
+        """
+        This function adds the result of one trace to the aggregates.
+
+        Parameters
+        ----------
+        fitting : bool
+            whether the trace is perfectly fitting
+        cost : integer
+            cost of the optimal alignment of the trace, None if only the fitness was checked. (Default: None)
+        over_bound : bool
+            whether the alignment of the trace cost more than the bound of a cost bounded alignment. (Default: False)
+        without_alignment : bool
+            whether the trace has no alignment because the model can not reach an accepting place. (Default: False)
+
+        Returns
+        -------
+        None.
+        """
+        self.number_of_traces += 1
+        if fitting:
+            self.number_of_fitting_traces += 1
+        if cost is not None:
+            self.total_cost += cost
+            self.max_cost = max(self.max_cost, cost)
+        if over_bound:
+            self.number_of_traces_over_bound += 1
+        if without_alignment:
+            self.number_of_traces_without_alignment += 1
+
+    @property
+    def fittness(self):
+        """
+        The percentage of perfectly fitting traces seen so far, like the result of log_fittness.
+        """
+        if self.number_of_traces == 0:
+            return 0
+        return self.number_of_fitting_traces / self.number_of_traces
+
+    @property
+    def average_cost(self):
+        """
+        The average alignment cost of the traces seen so far, without the traces whose alignment cost more than the bound and the traces without alignment.
+        """
+        number_of_aligned_traces = self.number_of_traces - self.number_of_traces_over_bound - self.number_of_traces_without_alignment
+        if number_of_aligned_traces == 0:
+            return 0
+        return self.total_cost / number_of_aligned_traces
+
+def optimal_alignment_stream_on_nfa(nfa_model, traces, heuristic=None, summary=None, variant_cache_size=1000, max_cost=None, statistics=None, compact=False):
+    """
+    This function aligns the traces of any iterable, for example a file that is read lazily, and yields each result as soon as it is computed.
+    Only the results of the most recently seen trace variants are remembered, so the memory usage does not grow with the size of the log.
+
+    Parameters
+    ----------
+    nfa_model : Nfa or CompiledNfa object
+        nfa that describes the behaviour the traces should be aligned to.
+    traces : iterable of list of string
+        the traces that should be aligned with the model
+    heuristic : AlignmentHeuristic object or bool
+        when given, A* search is used instead of dijkstra. True computes the heuristic tables once for all traces. (Default: None)
+    summary : ConformanceSummary object
+        running aggregates that are updated with every trace. (Default: None)
+    variant_cache_size : integer
+        number of trace variants whose results are remembered. (Default: 1000)
+    max_cost : integer
+        when given, traces whose alignment would cost more are not aligned completely and their result is (None, max_cost + 1). (Default: None)
+    statistics : SearchStatistics object
+        records the work of the searches, traces whose result is remembered from an earlier trace are not searched again. (Default: None)
+    compact : bool
+        yields the alignments as CompactAlignment objects, so the remembered results of the variants need less memory. (Default: False)
+
+    Returns
+    -------
+    generator of tuples
+        (alignment, cost_alignment) for each trace in the order of the traces.
+    """
+    nfa_model = compiled_model(nfa_model) # compiled once for all traces
+    if heuristic is True:
+        heuristic = AlignmentHeuristic(nfa_model)
+    variant_cache = collections.OrderedDict()
+    for trace in traces:
+        variant = tuple(trace)
+        result = variant_cache.get(variant)
+        if result is None:
+            result = optimal_alignment_trace_on_nfa(nfa_model, list(trace), heuristic, max_cost, statistics, compact)
+            variant_cache[variant] = result
+            if len(variant_cache) > variant_cache_size:
+                variant_cache.popitem(last=False) # forget the least recently seen variant
+        else:
+            variant_cache.move_to_end(variant)
+        if summary is not None:
+            alignment, cost = result
+            summary.add(cost == 0, cost if alignment is not None else None, alignment is None and cost is not None, cost is None)
+        yield __independent_result(result) # the remembered result is not changed by changes of the yielded one
+
+def fittness_stream(nfa_model, traces, summary=None):
+    """
+    This function replays the traces of any iterable, for example a file that is read lazily, and yields for each trace whether it is fitting.
+
+    Parameters
+    ----------
+    nfa_model : NFA or CompiledNfa object
+        An Nfa describing the wanted behavior.
+    traces : iterable of list of strings
+        instances/traces taken from event log.
+    summary : ConformanceSummary object
+        running aggregates that are updated with every trace, its fittness is the result of log_fittness for all traces seen so far. (Default: None)
+    
+    Returns
+    -------
+    generator of bool
+        true for each fitting trace, false otherwise.
+    """
+    lazy_dfa = LazyDfa(nfa_model) # determinized on the fly, so each event is replayed with one lookup once the frequent states are known
+    for trace in traces:
+        input_trace_check_flag = trace_check(list(trace))
+        if not input_trace_check_flag:
+            exit()
+        fitting = lazy_dfa.is_trace_fitting(trace)
+        if summary is not None:
+            summary.add(fitting)
+        yield fitting
@@ -0,0 +1,189 @@
+from library.nfa import CompiledNfa, compiled_model
+
+
+class DfaState:
+    """
+    This class represents a state of a lazily determinized NFA, which is a set of places the NFA can be in at the same time.
+
+    Attributes
+    ----------
+    places : frozenset of int
+        numbers of the NFA places of this state, closed under epsilon transitions
+    is_accepting : bool
+        true if one of the places is an accepting place of the NFA
+    transitions : dictonairy
+        maps each activity whose successor state was already computed to the successor state
+
+    Methods
+    -------
+    __init__ : constructor
+       sets the places and whether the state is accepting.
+    """
+
+    __slots__ = ('places', 'is_accepting', 'transitions')
+
+    def __init__(self, places, is_accepting):
+        """
+        Constructor of class DfaState.
+
+        Parameters
+        ----------
+        places : frozenset of int
+            numbers of the NFA places of this state
+        is_accepting : bool
+            true if one of the places is an accepting place of the NFA
+
+        Returns
+        -------
+        None.
+        """
+        self.places = places
+        self.is_accepting = is_accepting
+        self.transitions = {}
+
+
+class LazyDfa:
+    """
+    This class answers whether traces are fitting a NFA model by determinizing the model on the fly (subset construction).
+    A state of the DFA is only created when a trace first reaches it and then kept in a cache of bounded size,
+    so checking a large log becomes one dictonairy lookup per event once the frequent states are known, without the exponential blowup of a full determinization.
+
+    Attributes
+    ----------
+    model : CompiledNfa object
+        the compiled model that is determinized
+    max_states : integer
+        maximal number of states kept in the cache
+    start_state : DfaState object
+        the state before the first event of a trace
+    dead_state : DfaState object
+        the state without places, a trace that reaches it can not be fitting any more
+
+    Methods
+    -------
+    __init__ : constructor
+       compiles the model and creates the start state.
+    is_trace_fitting : function
+       checks whether a trace is fitting the model.
+    log_fittness : function
+       calculates the percentage of fitting traces of a log.
+    """
+
+    def __init__(self, nfa_model, max_states=10000):
+        """
+        Constructor of class LazyDfa.
+
+        Parameters
+        ----------
+        nfa_model : Nfa or CompiledNfa object
+            the model the traces are checked against
+        max_states : integer
+            maximal number of states kept in the cache. (Default: 10000)
+
+        Returns
+        -------
+        None.
+        """
+        self.model = compiled_model(nfa_model)
+        self.max_states = max(max_states, 2)
+        self.dead_state = DfaState(frozenset(), False)
+        self.start_state = self.__state(frozenset(self.model.epsilon_closure(self.model.start_place)))
+        # cached states in the order they were created, the start and the dead state are never evicted
+        self.__states = {self.start_state.places: self.start_state, self.dead_state.places: self.dead_state}
+
+    def __state(self, places):
+        """
+        A helping function that creates the state for the given places.
+        """
+        if len(places) == 0:
+            return self.dead_state
+        for place in places:
+            if self.model.is_end_place[place]:
+                return DfaState(places, True)
+        return DfaState(places, False)
+
+    def __successor(self, state, activity):
+        """
+        A helping function that computes the successor of a state for an activity, which is only needed the first time the activity is replayed in the state.
+        """
+        model = self.model
+        activity_id = model.activity_id(activity)
+        places = frozenset()
+        if activity_id != CompiledNfa.UNKNOWN_ACTIVITY_ID:
+            places = frozenset(model.successor_places(state.places, activity_id))
+        successor = self.__states.get(places)
+        if successor is None:
+            if len(self.__states) >= self.max_states:
+                self.__evict()
+            successor = self.__state(places)
+            self.__states[places] = successor
+        state.transitions[activity] = successor
+        return successor
+
+    def __evict(self):
+        """
+        A helping function that removes the older half of the cached states and all transitions that lead to them.
+        As half of the cache is freed at once, the work of an eviction is spread over the states that are created until the next one.
+        """
+        evicted = set()
+        for places in list(self.__states):
+            if len(evicted) >= len(self.__states) // 2:
+                break
+            if places != self.start_state.places and places != self.dead_state.places:
+                evicted.add(places)
+                del self.__states[places]
+        for state in self.__states.values():
+            for activity in [activity for activity, successor in state.transitions.items() if successor.places in evicted]:
+                del state.transitions[activity]
+
+    @property
+    def number_of_states(self):
+        """
+        The number of states that are currently cached.
+        """
+        return len(self.__states)
+
+    def is_trace_fitting(self, trace):
+        """
+        This function checks if the given trace matches the model.
+
+        Parameters
+        ----------
+        trace : list of str
+            activities of a trace/an instance taken from event log.
+
+        Returns
+        -------
+        bool
+            true if it matches, false otherwise.
+        """
+        state = self.start_state
+        dead_state = self.dead_state
+        for activity in trace:
+            next_state = state.transitions.get(activity)
+            if next_state is None:
+                next_state = self.__successor(state, activity)
+            if next_state is dead_state:
+                return False
+            state = next_state
+        return state.is_accepting
+
+    def log_fittness(self, log):
+        """
+        This function calculates the percentage of perfectly fitting traces in the log (list of traces).
+
+        Parameters
+        ----------
+        log : list of list of strings
+            instances/traces taken from event log.
+
+        Returns
+        -------
+        variable: float
+            the percentage of perfectly fitting traces.
+        """
+        num_fitting_traces = 0
+        for trace in log:
+            if self.is_trace_fitting(trace):
+                num_fitting_traces += 1
+        return num_fitting_traces / len(log)
@@ -0,0 +1,94 @@
+import csv
+import xml.etree.ElementTree as ElementTree
+
+
+def read_text_log(path):
+    """
+    This function reads a log from a text file in which each line is one trace and each character of a line is one activity.
+    The lines are read one at a time, so the file is never loaded into memory as a whole.
+
+    Parameters
+    ----------
+    path : str
+        path of the text file
+
+    Returns
+    -------
+    generator of list of str
+        the traces of the log in the order of the file.
+    """
+    with open(path, "r") as file:
+        for line in file:
+            yield list(line.rstrip())
+
+
+def read_activity_mapping(path):
+    """
+    This function reads a csv file that maps the activities of an event log to the activities used in a model, like events_mapping.csv.
+    The file needs the columns "events" (activity in the log) and "mapping" (activity in the model).
+
+    Parameters
+    ----------
+    path : str
+        path of the csv file
+
+    Returns
+    -------
+    mapping: dictonairy
+        maps each activity of the log to the activity of the model.
+    """
+    with open(path, "r", newline="") as file:
+        return {row["events"]: row["mapping"] for row in csv.DictReader(file)}
+
+
+def __local_name(tag):
+    """
+    A helping function that removes the xml namespace from a tag, as XES files may or may not declare one.
+    """
+    return tag.rsplit("}", 1)[-1]
+
+
+def read_xes_log(path, activity_mapping=None, activity_key="concept:name"):
+    """
+    This function reads a log from a XES file and yields one trace at a time as a list of activities.
+    The file is parsed incrementally and every trace is removed from the parsed tree once it is yielded,
+    so also logs that are much larger than the memory can be checked against a model.
+
+    Parameters
+    ----------
+    path : str
+        path of the XES file
+    activity_mapping : dictonairy
+        renames the activities, for example read by read_activity_mapping. Activities that are not in the mapping are kept as they are. (Default: None)
+    activity_key : str
+        key of the event attribute that holds the activity. (Default: "concept:name")
+
+    Returns
+    -------
+    generator of list of str
+        the traces of the log in the order of the file, events without activity are skipped.
+    """
+    root = None
+    trace = None
+    for event, element in ElementTree.iterparse(path, events=("start", "end")):
+        tag = __local_name(element.tag)
+        if event == "start":
+            if root is None:
+                root = element
+            elif tag == "trace":
+                trace = []
+            continue
+        if tag == "event" and trace is not None:
+            for attribute in element:
+                if attribute.get("key") == activity_key:
+                    activity = attribute.get("value")
+                    if activity_mapping is not None:
+                        activity = activity_mapping.get(activity, activity)
+                    trace.append(activity)
+                    break
+            element.clear()
+        elif tag == "trace":
+            yield trace
+            trace = None
+            # forget everything parsed so far
+            root.clear()
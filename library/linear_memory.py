@@ -0,0 +1,167 @@
+from library.nfa import CompiledNfa, compiled_model, trace_check
+from library.compact_alignment import CompactAlignment, interned_trace_activities, follow_model_moves, alignment_codes, START_MOVE, LOG_ONLY_MOVE
+from array import array
+
+__INFINITY = float('inf')
+
+
+class __LayerGraph:
+    """
+    A helping class that holds the transitions of a model, or of the reversed model, in the form needed to advance the costs of a layer of places.
+    """
+    __slots__ = ('number_of_places', 'offsets', 'activities', 'targets', 'sources', 'transitions_of_activity')
+
+    def __init__(self, number_of_places, offsets, activities, targets):
+        self.number_of_places = number_of_places
+        self.offsets = offsets
+        self.activities = activities
+        self.targets = targets
+        self.sources = array('l', bytes(array('l').itemsize * len(targets)))
+        self.transitions_of_activity = {}
+        for place in range(number_of_places):
+            for t in range(offsets[place], offsets[place + 1]):
+                self.sources[t] = place
+                if activities[t] != CompiledNfa.EPSILON_ID:
+                    self.transitions_of_activity.setdefault(activities[t], []).append(t)
+
+
+def __reversed_graph(model):
+    """
+    A helping function that returns the layer graph of the model with all transitions reversed, which is used to compute the costs from a place to the end of a segment.
+    """
+    number_of_places = model.number_of_places
+    offsets = array('l', [0]) * (number_of_places + 1)
+    for target in model.transition_targets:
+        offsets[target + 1] += 1
+    for place in range(number_of_places):
+        offsets[place + 1] += offsets[place]
+    next_position = array('l', offsets[:-1])
+    activities = array('l', bytes(array('l').itemsize * len(model.transition_targets)))
+    targets = array('l', activities)
+    for place in range(number_of_places):
+        for t in range(model.transition_offsets[place], model.transition_offsets[place + 1]):
+            position = next_position[model.transition_targets[t]]
+            next_position[model.transition_targets[t]] += 1
+            activities[position] = model.transition_activities[t]
+            targets[position] = place
+    return __LayerGraph(number_of_places, offsets, activities, targets)
+
+
+def __advance_layer(graph, costs, activity, moves=None):
+    """
+    A helping function that returns the costs of the next layer, after the event with the given activity number was consumed by a move on log only or a synchronous move.
+    """
+    next_costs = [cost + 1 for cost in costs] # move on log only, the model stays in the place
+    if moves is not None:
+        for place, cost in enumerate(next_costs):
+            if cost != __INFINITY:
+                moves[place] = LOG_ONLY_MOVE
+    for t in graph.transitions_of_activity.get(activity, ()):
+        cost = costs[graph.sources[t]]
+        if cost < next_costs[graph.targets[t]]:
+            next_costs[graph.targets[t]] = cost
+            if moves is not None:
+                moves[graph.targets[t]] = 2 * t + 1
+    follow_model_moves(graph.offsets, graph.activities, graph.targets, next_costs, moves)
+    return next_costs
+
+
+def __layer_costs(graph, start_place, activities):
+    """
+    A helping function that returns the cheapest cost of each place after the given events, when starting in the start place.
+    Only the costs of the current layer are kept.
+    """
+    costs = [__INFINITY] * graph.number_of_places
+    costs[start_place] = 0
+    follow_model_moves(graph.offsets, graph.activities, graph.targets, costs)
+    for activity in activities:
+        costs = __advance_layer(graph, costs, activity)
+    return costs
+
+
+def __align_segment_directly(graph, trace_activities, alignment_activities, first, start_place, last, end_place, codes):
+    """
+    A helping function that aligns the events first to last - 1 from the start place to the end place with the move of each state stored,
+    and appends the codes of the moves of the cheapest path to codes.
+    """
+    costs = [__INFINITY] * graph.number_of_places
+    costs[start_place] = 0
+    layer_moves = [array('i', [START_MOVE]) * graph.number_of_places]
+    follow_model_moves(graph.offsets, graph.activities, graph.targets, costs, layer_moves[0])
+    for i in range(first, last):
+        layer_moves.append(array('i', [START_MOVE]) * graph.number_of_places)
+        costs = __advance_layer(graph, costs, trace_activities[i], layer_moves[-1])
+    # go back from the end place to the start place of the segment
+    codes.extend(alignment_codes(graph.offsets, graph.activities, lambda place, i: layer_moves[i - first][place], end_place, last, alignment_activities))
+
+
+def __align_segment(graph, reversed_graph, trace_activities, alignment_activities, first, start_place, last, end_place, max_states, codes):
+    """
+    A helping function that appends the codes of a cheapest path from the start place before event first to the end place after event last - 1 to codes.
+    Long segments are split in the middle: the place where a cheapest path crosses the middle layer is the place with the lowest sum of the cost
+    from the start place (forward) and the cost to the end place (backward), and both halves are aligned on their own.
+    """
+    if (last - first + 1) * graph.number_of_places <= max_states or last - first <= 1:
+        __align_segment_directly(graph, trace_activities, alignment_activities, first, start_place, last, end_place, codes)
+        return
+    middle = (first + last) // 2
+    forward_costs = __layer_costs(graph, start_place, (trace_activities[i] for i in range(first, middle)))
+    backward_costs = __layer_costs(reversed_graph, end_place, (trace_activities[i] for i in range(last - 1, middle - 1, -1)))
+    middle_place = min(range(graph.number_of_places), key=lambda place: forward_costs[place] + backward_costs[place])
+    __align_segment(graph, reversed_graph, trace_activities, alignment_activities, first, start_place, middle, middle_place, max_states, codes)
+    __align_segment(graph, reversed_graph, trace_activities, alignment_activities, middle, middle_place, last, end_place, max_states, codes)
+
+
+def optimal_alignment_linear_memory(nfa_model, trace, max_cost=None, compact=False, max_states=1 << 16):
+    """
+    This function computes an optimal alignment of a trace with memory that grows only with the number of places, not with the length of the trace,
+    which makes it possible to align traces with tens of thousands of events.
+    The alignment is a cheapest path through one layer of places per position of the trace, and only the costs of the current layer are kept.
+    The path itself is recovered by divide and conquer over the positions of the trace (like the algorithm of Hirschberg):
+    the cheapest costs from the start to the middle layer and from the middle layer to the end give the place the path crosses the middle layer in,
+    and both halves are aligned the same way until they are short enough to store the moves of all their states.
+    This recomputes the costs about once per level of the division, so it is slower than optimal_alignment_trace_on_nfa, but it has the same optimal cost.
+
+    Parameters
+    ----------
+    nfa_model : Nfa or CompiledNfa object
+        nfa that describes the behaviour the trace should be aligned to.
+    trace : list of strings
+        the trace that should be aligned with the model
+    max_cost : integer
+        when given, the alignment is not recovered if it costs more than max_cost, the result is (None, max_cost + 1) then. (Default: None)
+    compact : bool
+        returns the alignment as CompactAlignment object. (Default: False)
+    max_states : integer
+        segments with at most this number of states (places times positions) are aligned with the moves of all their states stored. (Default: 65536)
+
+    Returns
+    -------
+    alignment: list of tuples of string or CompactAlignment object
+        The first item of the tuple is move on trace and the second is move on model, None if no alignment exists or it costs more than max_cost.
+    cost_alignment: integer
+        number of not synchronized moves, max_cost + 1 if it costs more than max_cost, None if no alignment exists.
+    """
+    input_trace_check_flag = trace_check(trace)
+    if not input_trace_check_flag:
+        exit()
+    model = compiled_model(nfa_model)
+    trace_activities = [model.activity_id(activity) for activity in trace]
+    graph = __LayerGraph(model.number_of_places, model.transition_offsets, model.transition_activities, model.transition_targets)
+
+    # the cost of the alignment and the accepting place it ends in, from the costs of the last layer
+    costs = __layer_costs(graph, model.start_place, trace_activities)
+    end_place = min(model.end_places, key=lambda place: costs[place], default=None)
+    if end_place is None or costs[end_place] == __INFINITY:
+        return (None, None)
+    cost_alignment = costs[end_place]
+    if max_cost is not None and cost_alignment > max_cost:
+        return (None, max_cost + 1)
+
+    activities, alignment_activities = interned_trace_activities(model.activities, trace, trace_activities)
+    codes = array('i')
+    __align_segment(graph, __reversed_graph(model), trace_activities, alignment_activities, 0, model.start_place, len(trace), end_place, max_states, codes)
+    alignment = CompactAlignment(codes, activities)
+    if not compact:
+        alignment = list(alignment)
+    return (alignment, int(cost_alignment))
@@ -0,0 +1,176 @@
+from library.nfa import CompiledNfa, compiled_model
+import collections
+
+
+class ModelAnalysis:
+    """
+    This class holds the tables about the structure of a model that the replay, alignment and heuristic algorithms need,
+    so that they are computed once per model instead of once per trace or per call.
+    The analysis of a compiled model is kept with the model, see model_analysis, and every algorithm that gets the same compiled model reuses it.
+    The tables that are only needed by some algorithms, the epsilon closures of all places, the distances to the transitions of an activity and the distance matrix,
+    are computed on first use.
+
+    Attributes
+    ----------
+    model : CompiledNfa object
+        the compiled model the tables belong to
+    reachable_activities : list of int
+        bitset of the activity numbers that can still be produced when starting in each place
+    distance_to_end : list of int
+        minimal number of moves on model only needed to reach an accepting place from each place, infinity if no accepting place can be reached
+
+    Methods
+    -------
+    __init__ : constructor
+       computes the tables of the given model.
+    epsilon_closures : property
+       the places that can be reached from each place by epsilon transitions.
+    distance_to_activity : function
+       returns the minimal number of moves on model only needed to reach a transition of an activity from each place.
+    distance_matrix : property
+       the minimal cost of the moves on model only between all pairs of places, as NumPy matrix.
+    """
+
+    INFINITY = 1 << 28 # distance in the distance matrix of places that can not be reached, larger than any alignment cost but small enough that sums of two do not overflow
+
+    def __init__(self, nfa_model):
+        """
+        Constructor of class ModelAnalysis.
+
+        Parameters
+        ----------
+        nfa_model : Nfa or CompiledNfa object
+            the model that is analysed
+
+        Returns
+        -------
+        None.
+        """
+        model = compiled_model(nfa_model)
+        self.model = model
+
+        # incoming transitions of each place as (start place, activity number)
+        predecessors = [[] for _ in range(model.number_of_places)]
+        for place in range(model.number_of_places):
+            for t in range(model.transition_offsets[place], model.transition_offsets[place + 1]):
+                predecessors[model.transition_targets[t]].append((place, model.transition_activities[t]))
+        self.__predecessors = predecessors
+
+        # the activities a place can produce are the ones of its transitions and the ones of the places they lead to,
+        # a change is propagated backwards until nothing changes anymore (this also handles loops)
+        self.reachable_activities = [0] * model.number_of_places
+        changed_places = list(range(model.number_of_places))
+        while changed_places:
+            place = changed_places.pop()
+            for start_place, activity in predecessors[place]:
+                activity_bit = 0 if activity == CompiledNfa.EPSILON_ID else 1 << activity
+                reachable = self.reachable_activities[start_place] | self.reachable_activities[place] | activity_bit
+                if reachable != self.reachable_activities[start_place]:
+                    self.reachable_activities[start_place] = reachable
+                    changed_places.append(start_place)
+
+        self.distance_to_end = self.__backward_distances(model.end_places)
+        self.__epsilon_closures = None
+        self.__distances_to_activities = {}
+        self.__distance_matrix = None
+
+    def __backward_distances(self, target_places):
+        """
+        A helping function that computes the minimal cost of the moves on model only from each place to one of the target places,
+        with a backwards 0-1 breadth first search from the target places, epsilon moves have no cost.
+        """
+        distances = [float('inf')] * self.model.number_of_places
+        queue = collections.deque()
+        for place in target_places:
+            distances[place] = 0
+            queue.append(place)
+        while queue:
+            place = queue.popleft()
+            for start_place, activity in self.__predecessors[place]:
+                move_cost = 0 if activity == CompiledNfa.EPSILON_ID else 1
+                if distances[place] + move_cost < distances[start_place]:
+                    distances[start_place] = distances[place] + move_cost
+                    if move_cost == 0:
+                        queue.appendleft(start_place)
+                    else:
+                        queue.append(start_place)
+        return distances
+
+    @property
+    def epsilon_closures(self):
+        """
+        The places that can be reached from each place by epsilon transitions, including the place itself, as list of tuples.
+        The closures are shared with the compiled model, so its epsilon_closure function does not compute them again.
+        """
+        if self.__epsilon_closures is None:
+            self.__epsilon_closures = [self.model.epsilon_closure(place) for place in range(self.model.number_of_places)]
+        return self.__epsilon_closures
+
+    def distance_to_activity(self, activity_id):
+        """
+        This function returns the minimal number of moves on model only needed from each place to reach a place with a transition of the given activity.
+        The table of an activity is computed on first use and kept for all later calls.
+
+        Parameters
+        ----------
+        activity_id : integer
+            number of the activity in the compiled model
+
+        Returns
+        -------
+        list of int
+            the distance of each place, infinity if no transition of the activity can be reached.
+        """
+        distances = self.__distances_to_activities.get(activity_id)
+        if distances is None:
+            model = self.model
+            places = [place for place in range(model.number_of_places)
+                      if any(model.transition_activities[t] == activity_id for t in range(model.transition_offsets[place], model.transition_offsets[place + 1]))]
+            distances = self.__distances_to_activities[activity_id] = self.__backward_distances(places)
+        return distances
+
+    @property
+    def distance_matrix(self):
+        """
+        The minimal cost of the moves on model only from each place (row) to each place (column), INFINITY if the place can not be reached.
+        A visible move costs 1 and an epsilon move 0. The matrix is computed with the algorithm of Floyd and Warshall on first use,
+        which takes time cubic in the number of places, so it is meant for models with up to a few hundred places. NumPy is needed for this matrix.
+        """
+        if self.__distance_matrix is None:
+            import numpy as np
+            model = self.model
+            number_of_places = model.number_of_places
+            distances = np.full((number_of_places, number_of_places), self.INFINITY, dtype=np.int32)
+            np.fill_diagonal(distances, 0)
+            for place in range(number_of_places):
+                for t in range(model.transition_offsets[place], model.transition_offsets[place + 1]):
+                    cost = 0 if model.transition_activities[t] == CompiledNfa.EPSILON_ID else 1
+                    target = model.transition_targets[t]
+                    distances[place, target] = min(distances[place, target], cost)
+            for middle_place in range(number_of_places):
+                np.minimum(distances, distances[:, middle_place, None] + distances[None, middle_place, :], out=distances)
+            np.minimum(distances, self.INFINITY, out=distances)
+            distances.setflags(write=False) # shared by all users of the analysis
+            self.__distance_matrix = distances
+        return self.__distance_matrix
+
+
+def model_analysis(nfa_model):
+    """
+    Function that returns the analysis of a model, which is computed on the first call for a compiled model and kept with it for all later calls.
+    A model that is not compiled yet is compiled first, so the analysis is only reused when the same compiled model is passed again.
+
+    Parameters
+    ----------
+    nfa_model : Nfa or CompiledNfa object
+        the model
+
+    Returns
+    -------
+    ModelAnalysis object
+        the analysis of the compiled model.
+    """
+    model = compiled_model(nfa_model)
+    if model._analysis is None:
+        model._analysis = ModelAnalysis(model)
+    return model._analysis
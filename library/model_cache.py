@@ -0,0 +1,190 @@
+from library.nfa import CompiledNfa, compiled_model, nfa_from_regex
+from library.serialization import save_nfa, load_nfa
+from array import array
+import collections
+import hashlib
+import os
+import tempfile
+
+
+def regex_fingerprint(regex):
+    """
+    Function that returns a stable fingerprint of a regular expression, which is the same in every process and every run.
+
+    Parameters
+    ----------
+    regex : list of characters
+        tokens of the regular expression
+
+    Returns
+    -------
+    str
+        hexadecimal sha256 digest of the tokens.
+    """
+    digest = hashlib.sha256(b"regex")
+    for token in regex:
+        encoded_token = str(token).encode("utf-8")
+        digest.update(len(encoded_token).to_bytes(4, "little"))
+        digest.update(encoded_token)
+    return digest.hexdigest()
+
+
+def model_fingerprint(nfa_model):
+    """
+    Function that returns a stable fingerprint of the structure of a model.
+    Two models have the same fingerprint if their places, in the order of the model, have the same labels and the same transitions.
+
+    Parameters
+    ----------
+    nfa_model : Nfa or CompiledNfa object
+        the model
+
+    Returns
+    -------
+    str
+        hexadecimal sha256 digest of the compiled model.
+    """
+    nfa_model = compiled_model(nfa_model)
+    digest = hashlib.sha256(b"model")
+    for part in (nfa_model.label, nfa_model.place_labels, nfa_model.activities, nfa_model.start_place, nfa_model.end_places):
+        encoded_part = repr(part).encode("utf-8")
+        digest.update(len(encoded_part).to_bytes(4, "little"))
+        digest.update(encoded_part)
+    for numbers in (nfa_model.transition_offsets, nfa_model.transition_activities, nfa_model.transition_targets):
+        digest.update(len(numbers).to_bytes(4, "little"))
+        digest.update(array('q', numbers).tobytes())
+    return digest.hexdigest()
+
+
+class ModelCache:
+    """
+    This class keeps compiled models so that a model that was built before does not have to be parsed and compiled again.
+    The models are kept in memory, up to a maximal number with the least recently used model dropped first,
+    and optionally in a directory, so that other processes and later runs can load the ready-to-run model from disk.
+    The files are written with save_nfa and memory mapped when they are loaded, so processes that load the same model share its memory.
+    The models are found by a fingerprint of their regular expression or of their structure.
+    The epsilon closures are not stored, as the closures of all places can grow with the square of the number of places, they are computed when they are first needed.
+
+    Attributes
+    ----------
+    directory : str or None
+        directory the compiled models are stored in, None if they are only kept in memory
+    max_models : integer
+        maximal number of models kept in memory
+
+    Methods
+    -------
+    __init__ : constructor
+       creates an empty cache.
+    model_from_regex : function
+       returns the compiled model of a regular expression.
+    compiled : function
+       returns the compiled model of a NFA.
+    """
+
+    FILE_SUFFIX = ".cnfa"
+
+    def __init__(self, directory=None, max_models=128):
+        """
+        Constructor of class ModelCache.
+
+        Parameters
+        ----------
+        directory : str, optional
+            directory the compiled models are stored in, it is created if it does not exist. By default the models are only kept in memory.
+        max_models : integer, optional
+            maximal number of models kept in memory. The default is 128.
+
+        Returns
+        -------
+        None.
+        """
+        self.directory = directory
+        self.max_models = max_models
+        self.__models = collections.OrderedDict()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self.__models)
+
+    def model_from_regex(self, regex):
+        """
+        This function returns the compiled model of the given regular expression.
+        The regular expression is only parsed if its model is neither in memory nor in the directory of the cache.
+
+        Parameters
+        ----------
+        regex : list of characters
+            regular expression of the model
+
+        Returns
+        -------
+        CompiledNfa object
+            the compiled model of the regular expression.
+        """
+        return self.__get("regex-" + regex_fingerprint(regex), lambda: CompiledNfa(nfa_from_regex(list(regex))))
+
+    def compiled(self, nfa_model):
+        """
+        This function returns the compiled model of the given NFA, which is the cached one if a model with the same structure was compiled before.
+
+        Parameters
+        ----------
+        nfa_model : Nfa or CompiledNfa object
+            the model
+
+        Returns
+        -------
+        CompiledNfa object
+            the compiled model.
+        """
+        nfa_model = compiled_model(nfa_model)
+        return self.__get("model-" + model_fingerprint(nfa_model), lambda: nfa_model)
+
+    def __get(self, key, build):
+        """
+        A helping function that looks up a model in memory, then on disk, and builds and stores it if it is not found.
+        """
+        model = self.__models.get(key)
+        if model is not None:
+            self.__models.move_to_end(key)
+            return model
+        model = self.__load(key)
+        if model is None:
+            model = build()
+            self.__store(key, model)
+        self.__models[key] = model
+        if len(self.__models) > self.max_models:
+            self.__models.popitem(last=False)
+        return model
+
+    def __path(self, key):
+        return os.path.join(self.directory, key + self.FILE_SUFFIX)
+
+    def __load(self, key):
+        """
+        A helping function that loads a model from the directory, or returns None if it is not stored or was stored in another format.
+        """
+        if self.directory is None:
+            return None
+        try:
+            return load_nfa(self.__path(key))
+        except (OSError, ValueError):
+            return None
+
+    def __store(self, key, model):
+        """
+        A helping function that writes a model into the directory.
+        The model is written to a temporary file first, so that other processes never read a half written model.
+        """
+        if self.directory is None:
+            return
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(file_descriptor)
+        try:
+            save_nfa(model, temporary_path)
+            os.replace(temporary_path, self.__path(key))
+        except OSError:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
@@ -1,3 +1,6 @@
+from array import array
+
+
 class SpecialActivities:
     """
     This class is the collection of special characters used in regular expressions.
@@ -30,6 +33,8 @@ class Place:
 
     """
 
+    __slots__ = ('label', 'transitions')
+
     def __init__(self, label):
         """
         Constructor of class Place.
@@ -51,6 +56,8 @@ class Place:
 
 
 class PlaceCombined(Place):
+    __slots__ = ('model_place', 'trace_place')
+
     def __init__(self, label):
         """
         Constructor of class Place.
@@ -92,6 +99,8 @@ class Transition:
 
     """
 
+    __slots__ = ('activity', 'start_place', 'end_place')
+
     def __init__(self, activity, start_place, end_place):
         """
         Constructor of class Transition that sets values of the instance.
@@ -116,6 +125,8 @@ class Transition:
 
 
 class TransitionWithCost(Transition):
+    __slots__ = ('cost', 'alignment_element')
+
     def __init__(self, activity, start_place, end_place, cost, alignment_element):
         super().__init__(activity, start_place, end_place)
         self.cost = cost
@@ -171,6 +182,7 @@ class Nfa:
         self.transitions = []
         self.start_place = None  # here we use the definiton of an NFA with just one start place
         self.end_places = []  # but multiple acepting end places
+        self.__place_set = set()  # the places again, to find out in constant time whether a place belongs to the NFA
 
     def print(self):
         """
@@ -185,15 +197,18 @@ class Nfa:
         None.
 
         """
-        print("Start place: " + self.start_place.label + str(self.places.index(self.start_place)))
+        place_index = {}
+        for place in self.places:
+            place_index.setdefault(place, len(place_index))
+        print("Start place: " + self.start_place.label + str(place_index[self.start_place]))
         for place in self.places:
-            print("Place: " + place.label + "_" + str(self.places.index(place)))
+            print("Place: " + place.label + "_" + str(place_index[place]))
             if place in self.end_places:
                 print("Endplace")
             for trans in place.transitions:
-                print("" + trans.start_place.label + "_" + str(self.places.index(
-                    trans.start_place)) + " - " + trans.activity + " - " + trans.end_place.label + "_" + str(
-                    self.places.index(trans.end_place)))
+                print("" + trans.start_place.label + "_" + str(place_index[
+                    trans.start_place]) + " - " + trans.activity + " - " + trans.end_place.label + "_" + str(
+                    place_index[trans.end_place]))
 
     def add_place(self, place, is_start_place=False, is_end_place=False):
         """
@@ -217,6 +232,7 @@ class Nfa:
 
         # check whether place allready exist
         self.places.append(place)
+        self.__place_set.add(place)
         if is_start_place and (self.start_place is None):
             # check whether allready a start place is defined
             self.start_place = place
@@ -239,6 +255,8 @@ class Nfa:
         # check whether place is a Place
 
         self.places.remove(place)
+        if place not in self.places:
+            self.__place_set.discard(place)
 
     def add_Transition(self, transition):
         """
@@ -257,10 +275,8 @@ class Nfa:
         # check whether transition is a Transition
         # check whether transition only has places that exist
         # check for duplicate
-        for place in self.places:
-            if place == transition.start_place:
-                place.transitions.append(transition)
-                break
+        if transition.start_place in self.__place_set:
+            transition.start_place.transitions.append(transition)
 
     def remove_Transition(self, transition):
         """
@@ -277,10 +293,224 @@ class Nfa:
 
         """
         # input checks
-        for place in self.places:
-            if place == transition.start_place:
-                place.transitions.remove(transition)
-                break
+        if transition.start_place in self.__place_set:
+            transition.start_place.transitions.remove(transition)
+
+
+class CompiledNfa:
+    """
+    This class is a compact, read only representation of a NFA model that is used by the replay and alignment algorithms.
+    The places are numbered from 0 to n-1 in the order of the places of the NFA and the activities are interned to small numbers.
+    The transitions are stored in flat arrays that are sorted by their start place (compressed sparse row format),
+    so the transitions of place p are the entries transition_offsets[p] to transition_offsets[p+1] - 1.
+
+    Attributes
+    ----------
+    label : str
+        name of the NFA
+    place_labels : list of str
+        label of each place
+    activities : list of str
+        activity of each activity number, number 0 is always epsilon
+    activity_ids : dictonairy
+        maps each activity to its number
+    start_place : int
+        number of the start place
+    end_places : list of int
+        numbers of the accepting places in the order of the NFA
+    is_end_place : array of int
+        1 for each accepting place, 0 otherwise
+    transition_offsets : array of int
+        index of the first transition of each place, has one more entry than there are places
+    transition_activities : array of int
+        activity number of each transition
+    transition_targets : array of int
+        number of the end place of each transition
+
+    Methods
+    -------
+    __init__ : constructor
+       compiles the given NFA.
+    activity_id : function
+       returns the number of an activity.
+    epsilon_closure : function
+       returns the places that can be reached from a place by epsilon transitions.
+    successor_places : function
+       returns the places that can be reached from a set of places by a transition of an activity.
+    """
+
+    __slots__ = ('label', 'place_labels', 'activities', 'activity_ids', 'start_place', 'end_places', 'is_end_place',
+                 'transition_offsets', 'transition_activities', 'transition_targets', '_epsilon_closures', '_stored_closures', '_analysis')
+
+    EPSILON_ID = 0
+    UNKNOWN_ACTIVITY_ID = -1
+
+    def __init__(self, nfa):
+        """
+        Constructor of class CompiledNfa that numbers the places and activities of the given NFA.
+
+        Parameters
+        ----------
+        nfa : Nfa
+            the model that is compiled
+
+        Returns
+        -------
+        None.
+        """
+        self.label = nfa.label
+        place_numbers = {}
+        places = []
+        for place in nfa.places:
+            if place not in place_numbers:
+                place_numbers[place] = len(places)
+                places.append(place)
+        if nfa.start_place not in place_numbers:
+            place_numbers[nfa.start_place] = len(places)
+            places.append(nfa.start_place)
+
+        self.activities = [SpecialActivities.EPSILON]
+        self.activity_ids = {SpecialActivities.EPSILON: self.EPSILON_ID}
+        self.transition_offsets = array('l', [0])
+        self.transition_activities = array('l')
+        self.transition_targets = array('l')
+        # places that are only reached by transitions but were not added to the nfa are numbered after all other places
+        for place in places:
+            for trans in place.transitions:
+                if trans.activity not in self.activity_ids:
+                    self.activity_ids[trans.activity] = len(self.activities)
+                    self.activities.append(trans.activity)
+                if trans.end_place not in place_numbers:
+                    place_numbers[trans.end_place] = len(places)
+                    places.append(trans.end_place)
+                self.transition_activities.append(self.activity_ids[trans.activity])
+                self.transition_targets.append(place_numbers[trans.end_place])
+            self.transition_offsets.append(len(self.transition_targets))
+
+        self.place_labels = [place.label for place in places]
+        self.start_place = place_numbers[nfa.start_place]
+        self.end_places = []
+        self.is_end_place = array('b', bytes(len(places)))
+        for place in nfa.end_places:
+            if place in place_numbers and not self.is_end_place[place_numbers[place]]:
+                self.end_places.append(place_numbers[place])
+                self.is_end_place[place_numbers[place]] = 1
+        self._epsilon_closures = {}
+        self._stored_closures = None # (closure offsets, closure places) of a model loaded with stored closures, see library.serialization
+        self._analysis = None # the ModelAnalysis of the model, see model_analysis
+
+    def __getstate__(self):
+        # the arrays of a model loaded from a file can be views into the file, which are copied into arrays for pickling
+        state = {name: getattr(self, name) for name in self.__slots__}
+        for name in ('transition_offsets', 'transition_activities', 'transition_targets'):
+            state[name] = array('l', state[name])
+        state['is_end_place'] = array('b', state['is_end_place'])
+        if state['_stored_closures'] is not None:
+            state['_stored_closures'] = tuple(array('l', section) for section in state['_stored_closures'])
+        return state
+
+    def __setstate__(self, state):
+        self._stored_closures = None
+        self._analysis = None
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    @property
+    def number_of_places(self):
+        """
+        The number of places of the compiled model.
+        """
+        return len(self.place_labels)
+
+    def activity_id(self, activity):
+        """
+        This function returns the number of the given activity, or UNKNOWN_ACTIVITY_ID if no transition of the model has this activity.
+        """
+        return self.activity_ids.get(activity, self.UNKNOWN_ACTIVITY_ID)
+
+    def epsilon_closure(self, place):
+        """
+        This function returns the numbers of all places that can be reached from the given place by only using epsilon transitions, including the place itself.
+        The closures are computed once per place and remembered as the compiled model can not change.
+        For a model that was loaded with stored closures, the closure is taken from the stored arrays on first use instead.
+
+        Parameters
+        ----------
+        place : int
+            number of the place the epsilon transitions start from
+
+        Returns
+        -------
+        closure: tuple of int
+            the places of the epsilon closure in the order they are found.
+        """
+        closure = self._epsilon_closures.get(place)
+        if closure is None and self._stored_closures is not None:
+            closure_offsets, closure_places = self._stored_closures
+            closure = self._epsilon_closures[place] = tuple(closure_places[closure_offsets[place]:closure_offsets[place + 1]])
+        if closure is None:
+            closure = [place]
+            seen = {place}
+            for closure_place in closure:
+                for t in range(self.transition_offsets[closure_place], self.transition_offsets[closure_place + 1]):
+                    if self.transition_activities[t] == self.EPSILON_ID and self.transition_targets[t] not in seen:
+                        seen.add(self.transition_targets[t])
+                        closure.append(self.transition_targets[t])
+            closure = tuple(closure)
+            self._epsilon_closures[place] = closure
+        return closure
+
+    def successor_places(self, places, activity_id):
+        """
+        This function returns the places that can be reached from the given places by one transition of the given activity followed by epsilon transitions.
+        The epsilon transitions are followed with one worklist for all reached places that stops at the places that were already reached,
+        so the closures of the places do not have to be joined and each place and transition is looked at at most once per call.
+
+        Parameters
+        ----------
+        places : iterable of int
+            numbers of the places the transitions start from
+        activity_id : int
+            number of the activity
+
+        Returns
+        -------
+        set of int
+            the reached places, empty if no place has a transition of the activity.
+        """
+        reached_places = set()
+        worklist = []
+        for place in places:
+            for t in range(self.transition_offsets[place], self.transition_offsets[place + 1]):
+                if self.transition_activities[t] == activity_id and self.transition_targets[t] not in reached_places:
+                    reached_places.add(self.transition_targets[t])
+                    worklist.append(self.transition_targets[t])
+        while worklist:
+            place = worklist.pop()
+            for t in range(self.transition_offsets[place], self.transition_offsets[place + 1]):
+                if self.transition_activities[t] == self.EPSILON_ID and self.transition_targets[t] not in reached_places:
+                    reached_places.add(self.transition_targets[t])
+                    worklist.append(self.transition_targets[t])
+        return reached_places
+
+
+def compiled_model(nfa_model):
+    """
+    Function that returns the compiled representation of a model, which is used by all replay and alignment algorithms.
+
+    Parameters
+    ----------
+    nfa_model : Nfa or CompiledNfa object
+        the model, a model that is already compiled is returned as it is.
+
+    Returns
+    -------
+    CompiledNfa object
+        the compiled model.
+    """
+    if isinstance(nfa_model, CompiledNfa):
+        return nfa_model
+    return CompiledNfa(nfa_model)
 
 
 def nfa_from_regex(regex):
@@ -300,7 +530,135 @@ def nfa_from_regex(regex):
     input_regex_check_flag = re_expression_check(regex)
     if not input_regex_check_flag:
         exit()
-    return expression(regex)
+    return __thompson_construction(regex)
+
+
+class __Fragment:
+    """
+    A part of the NFA that is built by the thomson construction, with exactly one start and one end place.
+    The places of the parts it is combined from are only referenced and put together in one list when the construction is done.
+    """
+
+    __slots__ = ('label', 'start_place', 'end_place', 'parts')
+
+    def __init__(self, label, start_place, end_place, parts):
+        self.label = label
+        self.start_place = start_place
+        self.end_place = end_place
+        self.parts = parts
+
+
+def __thompson_construction(regex):
+    """
+    Fucntion that creates the NFA of a regular expression with the same grammar and the same places and transitions as expression(regex),
+    but in a single pass over the regex without recursion. Every place and transition is created once instead of being copied into the NFA of each enclosing operator,
+    so the runtime is linear in the length of the regex and very deeply nested expressions are supported.
+
+    Parameters
+    ----------
+    regex : list of characters
+        regular expressions that will be converted to NFA model
+
+    Returns
+    -------
+    NFA : NFA object
+        the model that describe the same accepted language as regular expression
+    """
+    def fragment(label, parts):
+        start_place = Place(label[0] + "_s")
+        end_place = Place(label[0] + "_e")
+        return __Fragment(label, start_place, end_place, parts)
+
+    def connect(start_place, end_place):
+        start_place.transitions.append(Transition(SpecialActivities.EPSILON, start_place, end_place))
+
+    def unite(konkats):
+        # same construction as unite_nfas
+        if len(konkats) == 1:
+            return konkats[0]
+        united = fragment("unite", konkats)
+        for konkat in konkats:
+            connect(united.start_place, konkat.start_place)
+            connect(konkat.end_place, united.end_place)
+        return united
+
+    def konkatonate(prods):
+        # same construction as konkatonate_nfas
+        if len(prods) == 1:
+            return prods[0]
+        konkatonated = fragment("konkat", prods)
+        for i in range(len(prods) - 1):
+            connect(prods[i].end_place, prods[i + 1].start_place)
+        connect(konkatonated.start_place, prods[0].start_place)
+        connect(prods[-1].end_place, konkatonated.end_place)
+        return konkatonated
+
+    def star(factor):
+        # same construction as star_nfa
+        starred = fragment("star", [factor])
+        connect(starred.start_place, starred.end_place)
+        connect(starred.start_place, factor.start_place)
+        connect(factor.end_place, starred.end_place)
+        connect(factor.end_place, factor.start_place)
+        return starred
+
+    # each open parenthesis has an entry [finished konkats of the expression, finished prods of the current konkat]
+    open_expressions = [[[], []]]
+    position = 0
+    while True:
+        # Factor := Activity | "(" Expression ")"
+        while position < len(regex) and regex[position] == "(":
+            open_expressions.append([[], []])
+            position += 1
+        if position == len(regex) or not regex[position].isalpha():
+            print("Error: Was expecting an activity or an opening parenthesis but recived: " + (regex[position] if position < len(regex) else "the end of the expression"))
+            exit()
+        current = fragment("activity", [])
+        current.start_place.transitions.append(Transition(regex[position], current.start_place, current.end_place))
+        position += 1
+
+        while True:
+            # Prod := Factor ("*", "")
+            if position < len(regex) and regex[position] == "*":
+                position += 1
+                current = star(current)
+            konkats, prods = open_expressions[-1]
+            prods.append(current)
+            # Konkat := Prod {(".", "") Prod}
+            if position < len(regex) and regex[position] == ".":
+                position += 1
+                break
+            konkats.append(konkatonate(prods))
+            open_expressions[-1][1] = []
+            # Expression := Konkat { "|" Konkat}
+            if position < len(regex) and regex[position] == "|":
+                position += 1
+                break
+            current = unite(konkats)
+            open_expressions.pop()
+            if len(open_expressions) == 0:
+                # like expression(regex), everything after the first complete expression is ignored
+                return __flatten(current)
+            # the expression was the content of a parenthesis
+            if position < len(regex) and regex[position] != ")":
+                print("Error: Was expecting a closing parenthesis but recived: " + regex[position])
+            position += 1
+
+
+def __flatten(root):
+    """
+    A helping function that puts the places of all fragments of the thomson construction into one NFA, in the same order as the enclosing operators would add them.
+    """
+    built_nfa = Nfa(root.label)
+    built_nfa.add_place(root.start_place, True)
+    built_nfa.add_place(root.end_place, False, True)
+    not_added = list(reversed(root.parts))
+    while not_added:
+        part = not_added.pop()
+        built_nfa.add_place(part.start_place)
+        built_nfa.add_place(part.end_place)
+        not_added.extend(reversed(part.parts))
+    return built_nfa
 
 
 # Grammer used to describe the accepted regular expression: 
@@ -544,6 +902,79 @@ def nfa_from_activity(activity):
     return base_nfa
 
 
+def epsilon_free_nfa(nfa):
+    """
+    It compiles the given NFA into an equivalent NFA without epsilon transitions.
+    Every place of the new NFA takes over the non epsilon transitions of all places in its epsilon closure and it is an accepting place if its epsilon closure contains an accepting place.
+    Only the start place and places that are the target of a non epsilon transition are kept, which removes most places of NFAs created by the thomson construction.
+
+    Parameters
+    ----------
+    nfa : Nfa
+        any NFA, for example created by nfa_from_regex
+
+    Returns
+    -------
+    compiled_nfa: NFA object
+        NFA without epsilon transitions that accepts the same language and has the same number of moves on model for each path.
+    """
+    epsilon_closures = {}
+    compiled_nfa = Nfa(nfa.label)
+    compiled_places = {}
+    end_places = set(nfa.end_places)
+    # places of the given nfa in the order their compiled place was created, the list grows while it is iterated
+    found_places = []
+
+    def compiled_place(place):
+        # creates the place of the compiled nfa when it is first needed
+        if place not in compiled_places:
+            compiled_places[place] = Place(place.label)
+            closure = epsilon_closure(place, epsilon_closures)
+            compiled_nfa.add_place(compiled_places[place], place == nfa.start_place, not end_places.isdisjoint(closure))
+            found_places.append(place)
+        return compiled_places[place]
+
+    compiled_place(nfa.start_place)
+    for place in found_places:
+        added_transitions = set()
+        for closure_place in epsilon_closures[place]:
+            for trans in closure_place.transitions:
+                if trans.activity != SpecialActivities.EPSILON and (trans.activity, trans.end_place) not in added_transitions:
+                    added_transitions.add((trans.activity, trans.end_place))
+                    compiled_nfa.add_Transition(Transition(trans.activity, compiled_places[place], compiled_place(trans.end_place)))
+    return compiled_nfa
+
+
+def epsilon_closure(place, epsilon_closures=None):
+    """
+    It returns all places that can be reached from the given place by only using epsilon transitions, including the place itself.
+
+    Parameters
+    ----------
+    place : Place
+        the place the epsilon transitions start from
+    epsilon_closures : dictonairy
+        already computed closures that are reused and extended by this function. (Default: None)
+
+    Returns
+    -------
+    closure: list of Place
+        the places of the epsilon closure in the order they are found.
+    """
+    if epsilon_closures is not None and place in epsilon_closures:
+        return epsilon_closures[place]
+    closure = [place]
+    seen = {place}
+    for closure_place in closure:
+        for trans in closure_place.transitions:
+            if trans.activity == SpecialActivities.EPSILON and trans.end_place not in seen:
+                seen.add(trans.end_place)
+                closure.append(trans.end_place)
+    if epsilon_closures is not None:
+        epsilon_closures[place] = closure
+    return closure
+
+
 def trace_check(trace):  # done
     """
     Fucntion that checks whether the given trace is valid or not.
@@ -0,0 +1,147 @@
+from library.nfa import CompiledNfa, compiled_model, trace_check
+from library.model_analysis import model_analysis
+from library.compact_alignment import follow_model_moves, START_MOVE
+import bisect
+
+
+class OnlineConformance:
+    """
+    This class checks the conformance of one running case event by event.
+    It keeps, for each place of the model, the cost of the cheapest alignment of the events seen so far that ends in this place.
+    Each new event updates these costs with the moves of one step, so the work per event does not depend on how long the case already is.
+
+    Attributes
+    ----------
+    model : CompiledNfa object
+        the compiled model the case is checked against
+    costs : list of int
+        cost of the cheapest prefix alignment ending in each place, infinity if the place can not be reached
+    number_of_events : integer
+        number of events of the case seen so far
+
+    Methods
+    -------
+    __init__ : constructor
+       starts a new case.
+    add_event : function
+       adds the next event of the case and returns the new costs.
+    prefix_alignment : function
+       returns an optimal alignment of the events seen so far.
+    """
+
+    def __init__(self, nfa_model, heuristic=None):
+        """
+        Constructor of class OnlineConformance that starts a new case.
+
+        Parameters
+        ----------
+        nfa_model : Nfa or CompiledNfa object
+            nfa that describes the behaviour the case should follow.
+        heuristic : AlignmentHeuristic object
+            precomputed distances of the places to the accepting places. By default the distances of the analysis of the model are used, which all cases of the model share.
+
+        Returns
+        -------
+        None.
+        """
+        self.model = compiled_model(nfa_model)
+        if heuristic is None:
+            self.__distance_to_end = model_analysis(self.model).distance_to_end
+        else:
+            self.__distance_to_end = heuristic.distance_to_end
+        self.number_of_events = 0
+        self.costs = [float('inf')] * self.model.number_of_places
+        self.costs[self.model.start_place] = 0
+        # for each place the last move of its cheapest prefix alignment as linked list (move, previous entry), None for the empty alignment
+        self.__paths = [None] * self.model.number_of_places
+        self.__follow_model_moves()
+
+    def __follow_model_moves(self):
+        """
+        A helping function that lowers the costs of all places that can be reached cheaper by moves on model only.
+        The path of a place that was reached cheaper continues the path of the start place of its move, whose cost became final before.
+        """
+        model = self.model
+        moves = [START_MOVE] * model.number_of_places
+        for place in follow_model_moves(model.transition_offsets, model.transition_activities, model.transition_targets, self.costs, moves):
+            if moves[place] == START_MOVE:
+                continue # the cost of the place was not lowered
+            t = moves[place] >> 1
+            start_place = bisect.bisect_right(model.transition_offsets, t) - 1
+            activity = model.transition_activities[t]
+            if activity == CompiledNfa.EPSILON_ID:
+                self.__paths[place] = self.__paths[start_place] # epsilon moves are not part of the alignment
+            else:
+                self.__paths[place] = (('>>', model.activities[activity]), self.__paths[start_place])
+
+    def add_event(self, activity):
+        """
+        This function adds the next event of the case.
+
+        Parameters
+        ----------
+        activity : str
+            activity of the event
+
+        Returns
+        -------
+        prefix_cost: integer
+            cost of the optimal alignment of the events seen so far, the case may still continue.
+        completion_cost: integer
+            cost of the optimal alignment if the case ends now, which includes the moves on model only needed to reach an accepting place,
+            None if the model can not reach an accepting place.
+        """
+        input_trace_check_flag = trace_check([activity])
+        if not input_trace_check_flag:
+            exit()
+        model = self.model
+        activity_id = model.activity_id(activity)
+        # move on log only from every place, the model stays in the place
+        costs = [cost + 1 for cost in self.costs]
+        paths = [((activity, '>>'), path) for path in self.__paths]
+        # synchronous moves
+        for place in range(model.number_of_places):
+            if self.costs[place] == float('inf'):
+                continue
+            for t in range(model.transition_offsets[place], model.transition_offsets[place + 1]):
+                if model.transition_activities[t] == activity_id and self.costs[place] < costs[model.transition_targets[t]]:
+                    costs[model.transition_targets[t]] = self.costs[place]
+                    paths[model.transition_targets[t]] = ((activity, activity), self.__paths[place])
+        self.costs = costs
+        self.__paths = paths
+        self.number_of_events += 1
+        self.__follow_model_moves()
+        return (self.prefix_cost, self.completion_cost)
+
+    @property
+    def prefix_cost(self):
+        """
+        The cost of the optimal alignment of the events seen so far, where the model may end in any place.
+        """
+        return min(self.costs)
+
+    @property
+    def completion_cost(self):
+        """
+        The cost of the optimal alignment of the events seen so far if the case ends now, None if the model can not reach an accepting place.
+        """
+        completion_cost = min(cost + distance for cost, distance in zip(self.costs, self.__distance_to_end))
+        return None if completion_cost == float('inf') else completion_cost
+
+    def prefix_alignment(self):
+        """
+        This function returns an optimal alignment of the events seen so far.
+
+        Returns
+        -------
+        alignment: list of tuples of string
+            The first item of the tuple is move on trace and the second is move on model.
+        """
+        place = min(range(self.model.number_of_places), key=self.costs.__getitem__)
+        alignment = []
+        path = self.__paths[place]
+        while path is not None:
+            alignment.append(path[0])
+            path = path[1]
+        alignment.reverse()
+        return alignment
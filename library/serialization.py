@@ -0,0 +1,160 @@
+from library.nfa import CompiledNfa, compiled_model
+from array import array
+import mmap
+import struct
+import sys
+
+# layout of a model file, all numbers are little endian:
+# header: magic, format version, number of places, activities, transitions, end places, start place,
+#         whether epsilon closures are stored and the total length of all stored closures
+# then 32 bit integer sections: transition offsets, transition activities, transition targets, end places,
+# closure offsets and closure places (only if closures are stored), string offsets,
+# then the accepting flag of each place as one byte, padded to 4 bytes,
+# and finally the utf-8 encoded strings: label of the model, the activities and the place labels.
+MAGIC = b"CNFA"
+FORMAT_VERSION = 1
+__HEADER = struct.Struct("<4sIIIIIIII")
+
+
+def save_nfa(nfa_model, path, with_closures=False):
+    """
+    Function that writes a model into a binary file, where all places, interned activities and transitions are stored in flat arrays.
+
+    Parameters
+    ----------
+    nfa_model : Nfa or CompiledNfa object
+        the model that is written
+    path : str
+        path of the file
+    with_closures : bool, optional
+        also store the epsilon closures of all places, so that they do not have to be computed after loading. The default is False.
+        The closures of all places together can grow with the square of the number of places, for example for models of regular expressions with many stars,
+        so storing them makes the file and the time to save it much larger for such models.
+
+    Returns
+    -------
+    None.
+    """
+    nfa_model = compiled_model(nfa_model)
+    number_of_places = nfa_model.number_of_places
+
+    closure_offsets = array('i', [0])
+    closure_places = array('i')
+    if with_closures:
+        for place in range(number_of_places):
+            closure_places.extend(nfa_model.epsilon_closure(place))
+            closure_offsets.append(len(closure_places))
+
+    encoded_strings = [string.encode("utf-8") for string in [nfa_model.label] + nfa_model.activities + nfa_model.place_labels]
+    string_offsets = array('i', [0])
+    for encoded_string in encoded_strings:
+        string_offsets.append(string_offsets[-1] + len(encoded_string))
+
+    sections = [array('i', nfa_model.transition_offsets), array('i', nfa_model.transition_activities),
+                array('i', nfa_model.transition_targets), array('i', nfa_model.end_places)]
+    if with_closures:
+        sections += [closure_offsets, closure_places]
+    sections.append(string_offsets)
+    if sys.byteorder != "little":
+        for section in sections:
+            section.byteswap()
+
+    with open(path, "wb") as model_file:
+        model_file.write(__HEADER.pack(MAGIC, FORMAT_VERSION, number_of_places, len(nfa_model.activities),
+                                       len(nfa_model.transition_targets), len(nfa_model.end_places), nfa_model.start_place,
+                                       1 if with_closures else 0, len(closure_places)))
+        for section in sections:
+            section.tofile(model_file)
+        is_end_place = bytes(nfa_model.is_end_place)
+        model_file.write(is_end_place + bytes(-len(is_end_place) % 4))
+        model_file.write(b"".join(encoded_strings))
+
+
+def load_nfa(path, use_mmap=True):
+    """
+    Function that reads a model written by save_nfa.
+    By default the file is memory mapped and the transition arrays of the returned model are views into the mapped file,
+    so loading does not copy them and processes that load the same file share its memory.
+
+    Parameters
+    ----------
+    path : str
+        path of the file
+    use_mmap : bool, optional
+        map the file into memory instead of reading it. The default is True.
+
+    Returns
+    -------
+    CompiledNfa object
+        the model, which can be used by all replay and alignment algorithms.
+    """
+    with open(path, "rb") as model_file:
+        if use_mmap:
+            buffer = mmap.mmap(model_file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buffer = model_file.read()
+    return model_from_buffer(buffer)
+
+
+def model_from_buffer(buffer):
+    """
+    Function that creates a model from the content of a model file, the arrays of the model are views into the buffer.
+
+    Parameters
+    ----------
+    buffer : bytes-like object
+        content of a file written by save_nfa
+
+    Returns
+    -------
+    CompiledNfa object
+        the model.
+    """
+    view = memoryview(buffer)
+    if len(view) < __HEADER.size:
+        raise ValueError("not a model file: the file is too short")
+    magic, version, number_of_places, number_of_activities, number_of_transitions, number_of_end_places, start_place, \
+        with_closures, closure_size = __HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("not a model file: wrong magic number")
+    if version != FORMAT_VERSION:
+        raise ValueError("unsupported model file version " + str(version) + ", expected " + str(FORMAT_VERSION))
+
+    position = __HEADER.size
+
+    def integers(length):
+        nonlocal position
+        section = view[position:position + 4 * length]
+        if len(section) != 4 * length:
+            raise ValueError("not a model file: the file is truncated")
+        position += 4 * length
+        if sys.byteorder != "little":
+            section = array('i', section.tobytes())
+            section.byteswap()
+            return section
+        return section.cast('i')
+
+    model = CompiledNfa.__new__(CompiledNfa)
+    model.transition_offsets = integers(number_of_places + 1)
+    model.transition_activities = integers(number_of_transitions)
+    model.transition_targets = integers(number_of_transitions)
+    model.end_places = list(integers(number_of_end_places))
+    model._epsilon_closures = {}
+    model._stored_closures = None
+    model._analysis = None
+    if with_closures:
+        # the closures stay in the buffer, epsilon_closure takes the closure of a place from it on first use
+        model._stored_closures = (integers(number_of_places + 1), integers(closure_size))
+    string_offsets = integers(1 + number_of_activities + number_of_places + 1)
+    model.is_end_place = view[position:position + number_of_places].cast('b')
+    position += number_of_places + (-number_of_places % 4)
+
+    strings = []
+    for i in range(len(string_offsets) - 1):
+        strings.append(str(view[position + string_offsets[i]:position + string_offsets[i + 1]], "utf-8"))
+    model.label = strings[0]
+    model.activities = strings[1:1 + number_of_activities]
+    model.place_labels = strings[1 + number_of_activities:]
+    model.activity_ids = {activity: number for number, activity in enumerate(model.activities)}
+    model.start_place = start_place
+    return model
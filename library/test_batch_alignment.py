@@ -0,0 +1,30 @@
+from library.nfa import nfa_from_regex, Place
+from library.batch_alignment import BatchAligner
+from library import conformance
+import itertools
+import unittest
+class TestBatchAligner(unittest.TestCase):
+    def test_equal_length_costs(self):
+        regex = ["(", "a", ".", "b", "*", ".", "c", "|", "a", ".", "(", "b", "|", "d", ")", ".", "d", ")", "*", ".", "e"]
+        myNfa = nfa_from_regex(list(regex))
+        aligner = BatchAligner(myNfa, batch_size=7)
+        self.assertEqual(aligner.distances[aligner.model.start_place].min(), 0)
+        for length in range(5):
+            traces = [list(trace) for trace in itertools.product("abcdez", repeat=length)]
+            self.assertEqual(list(aligner.equal_length_costs(traces)),
+                             [conformance.optimal_alignment_trace_on_nfa(myNfa, trace)[1] for trace in traces])
+
+    def test_log_costs(self):
+        myNfa = nfa_from_regex(["(", "(", "a", ".", "b", ")", "*", "|", "c", "*", ")", "*", ".", "d"])
+        log = [["a", "b", "d"], [], ["c", "c", "a", "d"], ["a", "b", "d"], ["x", "y"], ["d", "d", "d"], ["a", "b", "a", "b", "c", "d"]]
+        self.assertEqual(BatchAligner(myNfa).log_costs(log), [cost for _, cost in conformance.optimal_alignment_log_on_nfa(myNfa, log)])
+
+    def test_no_alignment(self):
+        # the only accepting place can not be reached from the start place
+        myNfa = nfa_from_regex(list("a.b"))
+        myNfa.end_places = []
+        myNfa.add_place(Place("unreachable"), is_end_place=True)
+        aligner = BatchAligner(myNfa)
+        self.assertEqual(aligner.equal_length_costs([["a", "b"], ["x", "y"]]), [None, None])
+        self.assertEqual(aligner.log_costs([["a", "b"], []]), [cost for _, cost in conformance.optimal_alignment_log_on_nfa(myNfa, [["a", "b"], []])])
+        self.assertEqual(aligner.log_costs([["a", "b"], []]), [None, None])
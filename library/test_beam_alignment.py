@@ -0,0 +1,40 @@
+from library.nfa import nfa_from_regex
+from library.beam_alignment import approximate_alignment_beam_search
+from library.compact_alignment import CompactAlignment
+from library import conformance
+import itertools
+import unittest
+class TestBeamAlignment(unittest.TestCase):
+    def assertValidAlignment(self, model, trace, alignment, cost):
+        self.assertEqual([trace_move for trace_move, _ in alignment if trace_move != '>>'], trace)
+        self.assertTrue(conformance.is_trace_fitting(model, [model_move for _, model_move in alignment if model_move != '>>']))
+        self.assertEqual(sum(1 for trace_move, model_move in alignment if trace_move != model_move), cost)
+
+    def test_beam_alignment(self):
+        regex = ["(", "a", ".", "b", "*", ".", "c", "|", "a", ".", "(", "b", "|", "d", ")", ".", "d", ")", "*", ".", "e"]
+        myNfa = conformance.compiled_model(nfa_from_regex(list(regex)))
+        heuristic = conformance.AlignmentHeuristic(myNfa)
+        log = [list(trace) for length in range(5) for trace in itertools.product("abdez", repeat=length)]
+        for trace in log:
+            _, cost = conformance.optimal_alignment_trace_on_nfa(myNfa, trace)
+            for beam_width in (1, 2, 1000):
+                alignment, beam_cost, optimal = approximate_alignment_beam_search(myNfa, trace, beam_width, heuristic)
+                self.assertValidAlignment(myNfa, trace, alignment, beam_cost)
+                self.assertGreaterEqual(beam_cost, cost)
+                if optimal:
+                    self.assertEqual(beam_cost, cost)
+                if beam_width == 1000:
+                    # a beam that is wider than the model never drops a place
+                    self.assertTrue(optimal)
+        alignment, cost, optimal = approximate_alignment_beam_search(myNfa, ["a", "x", "c", "e"], compact=True)
+        self.assertIsInstance(alignment, CompactAlignment)
+        self.assertEqual((alignment, cost, optimal), (conformance.optimal_alignment_trace_on_nfa(myNfa, ["a", "x", "c", "e"])[0], 1, True))
+
+    def test_no_alignment(self):
+        # the accepting place can not be reached
+        myNfa = nfa_from_regex(list("a.b"))
+        myNfa.end_places = []
+        self.assertEqual(approximate_alignment_beam_search(myNfa, ["a", "b"]), (None, None, True))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+from library.nfa import nfa_from_regex
+from library.bitparallel import BitParallelNfa
+from library import conformance
+import itertools
+import unittest
+from unittest import mock
+class TestBitParallelNfa(unittest.TestCase):
+    def test_is_trace_fitting(self):
+        regex = ["(", "a", ".", "b", "*", ".", "c", "|", "a", ".", "(", "b", "|", "d", ")", ".", "d", ")", "*"]
+        myNfa = nfa_from_regex(list(regex))
+        bitNfa = BitParallelNfa(myNfa)
+        log = [list(trace) for length in range(6) for trace in itertools.product("abcdz", repeat=length)]
+        expected = [conformance.is_trace_fitting(myNfa, trace) for trace in log]
+        self.assertEqual([bitNfa.is_trace_fitting(trace) for trace in log], expected)
+        self.assertEqual(list(bitNfa.fitting_batch(log)), expected)
+        self.assertEqual(bitNfa.log_fittness(log), conformance.log_fittness(myNfa, log))
+        self.assertEqual(conformance.log_fittness(myNfa, log, bit_parallel=True), conformance.log_fittness(myNfa, log))
+        self.assertEqual(bitNfa.successor_mask(bitNfa.start_mask, "z"), 0)
+
+    def test_large_model(self):
+        # the sets of places reached by the traces are all different, so the masks span several bytes and words
+        regex = ["(", "a", "|", "b", ")", "*", ".", "a"]
+        for _ in range(70):
+            regex += [".", "(", "a", "|", "b", ")"]
+        myNfa = nfa_from_regex(regex)
+        bitNfa = BitParallelNfa(myNfa)
+        self.assertGreater(bitNfa.number_of_bytes, 8)
+        log = [["a"] + ["b"] * 70, ["b"] * 71, ["a", "b"] * 40, ["b", "a"] * 40, ["a"] * 70, [], ["a"] * 71 + ["c"]]
+        expected = [conformance.is_trace_fitting(myNfa, trace) for trace in log]
+        self.assertEqual(expected, [True, False, False, True, False, False, False])
+        self.assertEqual([bitNfa.is_trace_fitting(trace) for trace in log], expected)
+        self.assertEqual(list(bitNfa.fitting_batch(log)), expected)
+
+    def test_fallback_for_large_models(self):
+        myNfa = nfa_from_regex(list("(a.b|c)*.d"))
+        log = [list("abd"), list("cd"), list("ad"), list("ccabd")]
+        with mock.patch.object(BitParallelNfa, "MAX_PLACES", 0), mock.patch.object(BitParallelNfa, "fitting_batch") as fitting_batch:
+            self.assertEqual(conformance.log_fittness(myNfa, log, bit_parallel=True), 0.75)
+            fitting_batch.assert_not_called()
@@ -0,0 +1,55 @@
+from library.nfa import nfa_from_regex
+from library.compact_alignment import CompactAlignment, deviation_counts
+from library import conformance
+import collections
+import pickle
+import unittest
+class TestCompactAlignment(unittest.TestCase):
+    def setUp(self):
+        regex = ["(", "a", ".", "b", "*", ".", "c", "|", "a", ".", "(", "b", "|", "d", ")", ".", "d", ")", "*"]
+        self.myNfa = nfa_from_regex(list(regex))
+        self.log = [["a", "b", "c"], ["a", "c", "d"], ["a", "x", "b", "d"], [], ["d", "y", "x", "a"], ["a", "b", "c"]]
+
+    def test_same_moves_as_tuples(self):
+        for trace in self.log:
+            alignment, cost = conformance.optimal_alignment_trace_on_nfa(self.myNfa, trace)
+            compact_alignment, compact_cost = conformance.optimal_alignment_trace_on_nfa(self.myNfa, trace, compact=True)
+            self.assertIsInstance(compact_alignment, CompactAlignment)
+            self.assertEqual(compact_cost, cost)
+            self.assertEqual(compact_alignment, alignment)
+            self.assertEqual(list(compact_alignment), alignment)
+            self.assertEqual(len(compact_alignment), len(alignment))
+            self.assertEqual(compact_alignment.cost, cost)
+            if alignment:
+                self.assertEqual(compact_alignment[-1], alignment[-1])
+                self.assertEqual(compact_alignment[1:], alignment[1:])
+            self.assertEqual(CompactAlignment.from_moves(alignment), alignment)
+            self.assertEqual(pickle.loads(pickle.dumps(compact_alignment)), alignment)
+
+    def test_log_functions(self):
+        expected = conformance.optimal_alignment_log_on_nfa(self.myNfa, self.log)
+        for shared_prefixes in (False, True):
+            results = conformance.optimal_alignment_log_on_nfa(self.myNfa, self.log, shared_prefixes=shared_prefixes, compact=True)
+            self.assertEqual([cost for _, cost in results], [cost for _, cost in expected])
+            self.assertEqual([list(alignment) for alignment, _ in results], [alignment for alignment, _ in expected])
+        results = list(conformance.optimal_alignment_stream_on_nfa(self.myNfa, self.log, compact=True))
+        self.assertEqual([list(alignment) for alignment, _ in results], [alignment for alignment, _ in expected])
+        # traces without unknown activities share the activities list of the model
+        model = conformance.compiled_model(self.myNfa)
+        compact_alignment, _ = conformance.optimal_alignment_trace_on_nfa(model, ["a", "b", "c"], compact=True)
+        self.assertIs(compact_alignment.activities, model.activities)
+
+    def test_deviations(self):
+        results = conformance.optimal_alignment_log_on_nfa(self.myNfa, self.log, compact=True)
+        expected = collections.Counter()
+        for alignment, _ in conformance.optimal_alignment_log_on_nfa(self.myNfa, self.log):
+            expected.update(move for move in alignment if move[0] != move[1])
+        self.assertEqual(deviation_counts([alignment for alignment, _ in results] + [None]), expected)
+        alignment = CompactAlignment.from_moves([("a", "a"), ("x", ">>"), (">>", "b"), ("x", ">>")], ["a", "b"])
+        self.assertEqual(alignment.deviations(), collections.Counter({("x", ">>"): 2, (">>", "b"): 1}))
+        self.assertEqual(alignment.number_of_moves(CompactAlignment.LOG_MOVE), 2)
+        self.assertEqual(alignment.number_of_moves(CompactAlignment.MODEL_MOVE), 1)
+        self.assertEqual(alignment.activities, ["a", "b", "x"])
+
+if __name__ == '__main__':
+    unittest.main()
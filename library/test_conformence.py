@@ -1,4 +1,4 @@
-from library.nfa import Nfa, Place, Transition, nfa_from_regex,SpecialActivities
+from library.nfa import Nfa, Place, Transition, CompiledNfa, compiled_model, nfa_from_regex,SpecialActivities
 from library import conformance
 import unittest
 class TestConformence(unittest.TestCase):
@@ -81,3 +81,148 @@ class TestConformence(unittest.TestCase):
         self.assertEqual(conformance.optimal_alignment_trace_on_nfa(self.myNFA,myTrace),([('a', 'a'), ('z', '>>'), ('b', 'b'), ('b', 'b'), ('c', 'c')], 1))
         myTrace = ["a", "z", "b", "b"]
         self.assertEqual(conformance.optimal_alignment_trace_on_nfa(self.myNFA,myTrace),([('a', 'a'), ('z', '>>'), ('b', 'b'), ('b', 'b'), ('>>', 'c')], 2))
+    def test_optimal_alignment_log_on_nfa(self):
+        myRegexNfa = nfa_from_regex(["a", ".", "(", "b", "*", ")", ".", "(", "(", "c", ".", "d", ")", "*", ")"])
+        log = [["a"], ["a", "c", "d"], ["b"], ["a", "c"]]
+        self.assertEqual(conformance.optimal_alignment_log_on_nfa(myRegexNfa, log),
+                         [([('a', 'a')], 0), ([('a', 'a'), ('c', 'c'), ('d', 'd')], 0), ([('>>', 'a'), ('b', 'b')], 1), ([('a', 'a'), ('c', '>>')], 1)])
+    def test_optimal_alignment_trace_on_nfa_astar(self):
+        heuristic = conformance.AlignmentHeuristic(self.myNFA)
+        self.assertEqual(heuristic.distance_to_end[0], 3)
+        self.assertEqual(heuristic.distance_to_end[3], 0)
+        for myTrace in [["a", "b", "b", "b", "c", "z"], ["a", "z", "b", "b", "c"], ["a", "z", "b", "b"], [], ["c", "b", "a"]]:
+            alignment, cost = conformance.optimal_alignment_trace_on_nfa(self.myNFA, myTrace, heuristic)
+            self.assertEqual(cost, conformance.optimal_alignment_trace_on_nfa(self.myNFA, myTrace)[1])
+            self.assertEqual([move[0] for move in alignment if move[0] != '>>'], myTrace)
+        myRegexNfa = nfa_from_regex(["a", ".", "(", "b", "*", ")", ".", "(", "(", "c", ".", "d", ")", "*", ")"])
+        log = [["a"], ["a", "c", "d"], ["b"], ["a", "c"]]
+        self.assertEqual([cost for _, cost in conformance.optimal_alignment_log_on_nfa(myRegexNfa, log, True)], [0, 0, 1, 1])
+    def test_is_trace_fitting_ambiguous_and_epsilon_loops(self):
+        ambiguousNfa = nfa_from_regex(["(", "a", "|", "(", "a", ".", "b", ")", ")", "*"])
+        self.assertTrue(conformance.is_trace_fitting(ambiguousNfa, ["a", "b"] * 500 + ["a"] * 500))
+        self.assertFalse(conformance.is_trace_fitting(ambiguousNfa, ["a"] * 1000 + ["b", "b"]))
+        loopNfa = nfa_from_regex(["(", "a", "*", ")", "*"])
+        self.assertTrue(conformance.is_trace_fitting(loopNfa, []))
+        self.assertTrue(conformance.is_trace_fitting(loopNfa, ["a"] * 3000))
+        self.assertFalse(conformance.is_trace_fitting(loopNfa, ["a", "b"]))
+        self.assertEqual(conformance.log_fittness(loopNfa, [["a"], ["b"], [], ["a", "a"]]), 3/4)
+    def test_compiled_nfa(self):
+        compiledNfa = CompiledNfa(self.myNFA)
+        self.assertEqual(compiledNfa.place_labels, ["Greating", "Start Small Talk", "End Small Talk", "Good Bye"])
+        self.assertEqual(compiledNfa.start_place, 0)
+        self.assertEqual(compiledNfa.end_places, [3])
+        self.assertEqual(list(compiledNfa.transition_offsets), [0, 1, 3, 4, 4])
+        self.assertEqual(list(compiledNfa.transition_targets), [1, 1, 2, 3])
+        self.assertEqual([compiledNfa.activities[a] for a in compiledNfa.transition_activities], ["a", "b", "b", "c"])
+        self.assertEqual(compiledNfa.activity_id("z"), CompiledNfa.UNKNOWN_ACTIVITY_ID)
+        self.assertTrue(conformance.is_trace_fitting(compiledNfa, ["a", "b", "b", "c"]))
+        self.assertFalse(conformance.is_trace_fitting(compiledNfa, ["a", "z", "c"]))
+        myTrace = ["a", "z", "b", "b"]
+        self.assertEqual(conformance.optimal_alignment_trace_on_nfa(compiledNfa, myTrace),
+                         conformance.optimal_alignment_trace_on_nfa(self.myNFA, myTrace))
+        myRegexNfa = CompiledNfa(nfa_from_regex(["(", "a", "*", ")", "*"]))
+        self.assertEqual(len(myRegexNfa.epsilon_closure(myRegexNfa.start_place)), 5)
+        # a compiled model is used as it is, so the analysis kept with it is reused
+        self.assertIs(compiled_model(compiledNfa), compiledNfa)
+        self.assertIsInstance(compiled_model(self.myNFA), CompiledNfa)
+        self.assertIs(conformance.compiled_model, compiled_model)
+    def test_trace_variants(self):
+        log = [["a", "b", "c"], ["a", "c"], ["a", "b", "c"], [], ["a", "c"], ["a", "b", "c"]]
+        self.assertEqual(conformance.trace_variants(log), {("a", "b", "c"): [0, 2, 5], ("a", "c"): [1, 4], (): [3]})
+        variant_alignments = conformance.optimal_alignment_variants_on_nfa(self.myNFA, log)
+        self.assertEqual([(variant, count, cost) for variant, count, (_, cost) in variant_alignments],
+                         [(["a", "b", "c"], 3, 0), (["a", "c"], 2, 1), ([], 1, 3)])
+        alignments = conformance.optimal_alignment_log_on_nfa(self.myNFA, log)
+        self.assertEqual(alignments, [conformance.optimal_alignment_trace_on_nfa(self.myNFA, trace) for trace in log])
+        self.assertEqual(conformance.log_fittness(self.myNFA, log), 3/6)
+    def test_optimal_alignment_log_on_nfa_parallel(self):
+        log = [["a", "b", "c"], ["a", "z", "b", "b"], ["a", "b", "c"], [], ["c", "b", "a", "a"], ["a", "b", "b", "b", "b", "c"]]
+        self.assertEqual(conformance.optimal_alignment_log_on_nfa(self.myNFA, log, workers=2),
+                         conformance.optimal_alignment_log_on_nfa(self.myNFA, log))
+        self.assertEqual([cost for _, cost in conformance.optimal_alignment_log_on_nfa(self.myNFA, log, True, workers=2)], [0, 2, 0, 3, 5, 0])
+    def test_streams(self):
+        log = [["a", "b", "c"], ["a", "z", "b", "b"], ["a", "b", "c"], ["a", "c"]]
+        summary = conformance.ConformanceSummary()
+        alignments = conformance.optimal_alignment_stream_on_nfa(self.myNFA, iter(log), summary=summary, variant_cache_size=1)
+        self.assertEqual(next(alignments)[1], 0)
+        self.assertEqual(summary.number_of_traces, 1)
+        self.assertEqual(list(alignments), conformance.optimal_alignment_log_on_nfa(self.myNFA, log)[1:])
+        self.assertEqual((summary.number_of_traces, summary.number_of_fitting_traces, summary.total_cost, summary.max_cost), (4, 2, 3, 2))
+        self.assertEqual(summary.fittness, 2/4)
+        # the results of repeated trace variants are independent of each other
+        alignments = list(conformance.optimal_alignment_stream_on_nfa(self.myNFA, [["a", "z"], ["a", "z"]]))
+        alignments[0][0].append(("x", ">>"))
+        self.assertNotEqual(alignments[0][0], alignments[1][0])
+        summary = conformance.ConformanceSummary()
+        self.assertEqual(list(conformance.fittness_stream(self.myNFA, (trace for trace in log), summary)), [True, False, True, False])
+        self.assertEqual(summary.fittness, conformance.log_fittness(self.myNFA, log))
+    def test_optimal_alignment_prefix_trie_on_nfa(self):
+        log = [["a", "b", "c"], ["a", "z", "b", "b"], ["a", "b", "c"], [], ["a", "b"], ["a", "b", "b", "b", "b", "c", "c"], ["a"]]
+        alignments = conformance.optimal_alignment_log_on_nfa(self.myNFA, log, shared_prefixes=True)
+        self.assertEqual([cost for _, cost in alignments], [cost for _, cost in conformance.optimal_alignment_log_on_nfa(self.myNFA, log)])
+        for trace, (alignment, cost) in zip(log, alignments):
+            self.assertEqual([move[0] for move in alignment if move[0] != '>>'], trace)
+            self.assertEqual(len([move for move in alignment if move[0] != move[1]]), cost)
+            self.assertTrue(conformance.is_trace_fitting(self.myNFA, [move[1] for move in alignment if move[1] != '>>']))
+    def test_optimal_alignment_max_cost(self):
+        log = [["a", "b", "c"], ["a", "z", "b", "b"], ["a", "b", "c"], [], ["c", "b", "a", "a"], ["a", "b", "b", "b", "b", "c"]]
+        costs = [cost for _, cost in conformance.optimal_alignment_log_on_nfa(self.myNFA, log)]
+        for max_cost in range(6):
+            expected = [(alignment, cost) if cost <= max_cost else (None, max_cost + 1) for alignment, cost in conformance.optimal_alignment_log_on_nfa(self.myNFA, log)]
+            self.assertEqual(conformance.optimal_alignment_log_on_nfa(self.myNFA, log, max_cost=max_cost), expected)
+            self.assertEqual([cost for _, cost in conformance.optimal_alignment_log_on_nfa(self.myNFA, log, heuristic=True, max_cost=max_cost)],
+                             [cost for _, cost in expected])
+            self.assertEqual([cost for _, cost in conformance.optimal_alignment_log_on_nfa(self.myNFA, log, shared_prefixes=True, max_cost=max_cost)],
+                             [cost for _, cost in expected])
+        summary = conformance.ConformanceSummary()
+        self.assertEqual(list(conformance.optimal_alignment_stream_on_nfa(self.myNFA, log, summary=summary, max_cost=2))[4], (None, 3))
+        self.assertEqual((summary.number_of_traces, summary.number_of_traces_over_bound, summary.total_cost), (6, 2, 2))
+        self.assertEqual(summary.average_cost, 2 / 4)
+        self.assertEqual(costs, [0, 2, 0, 3, 5, 0])
+    def test_duplicate_traces_independent(self):
+        log = [["a", "z", "b"], ["a", "z", "b"]]
+        for shared_prefixes in (False, True):
+            alignments = conformance.optimal_alignment_log_on_nfa(self.myNFA, log, shared_prefixes=shared_prefixes)
+            self.assertEqual(alignments[0], alignments[1])
+            alignments[0][0].append(("x", ">>"))
+            self.assertNotEqual(alignments[0][0], alignments[1][0])
+    def test_stream_without_alignment(self):
+        # the accepting place can not be reached, so no trace has an alignment, whatever the bound is
+        myNfa = nfa_from_regex(list("a.b"))
+        myNfa.end_places = []
+        for max_cost in (None, 5):
+            summary = conformance.ConformanceSummary()
+            self.assertEqual(list(conformance.optimal_alignment_stream_on_nfa(myNfa, [["a", "b"], []], summary=summary, max_cost=max_cost)), [(None, None)] * 2)
+            self.assertEqual((summary.number_of_traces_over_bound, summary.number_of_traces_without_alignment, summary.average_cost), (0, 2, 0))
+            for shared_prefixes in (False, True):
+                self.assertEqual(conformance.optimal_alignment_log_on_nfa(myNfa, [["a", "b"], []], shared_prefixes=shared_prefixes, max_cost=max_cost), [(None, None)] * 2)
+    def test_search_statistics(self):
+        log = [["a", "b", "c"], ["a", "z", "b", "b"], ["a", "b", "c"], [], ["c", "b", "a", "a"]]
+        searches = []
+        statistics = conformance.SearchStatistics(lambda trace, counters: searches.append((trace, counters)))
+        alignments = conformance.optimal_alignment_log_on_nfa(self.myNFA, log, statistics=statistics)
+        self.assertEqual(alignments, conformance.optimal_alignment_log_on_nfa(self.myNFA, log))
+        self.assertEqual(statistics.number_of_searches, 4)
+        self.assertEqual([trace for trace, _ in searches], [["a", "b", "c"], ["a", "z", "b", "b"], [], ["c", "b", "a", "a"]])
+        for _, counters in searches:
+            self.assertLessEqual(counters['states_expanded'], counters['states_created'])
+            self.assertLessEqual(counters['queue_pops'], counters['queue_pushes'])
+            self.assertEqual(counters['epsilon_moves'], 0)
+        self.assertEqual(statistics.states_created, sum(counters['states_created'] for _, counters in searches))
+        self.assertEqual(statistics.peak_frontier, max(counters['peak_frontier'] for _, counters in searches))
+        self.assertIn(statistics.slowest_trace, log)
+        # the counters of the worker processes are added up
+        parallelStatistics = conformance.SearchStatistics()
+        conformance.optimal_alignment_log_on_nfa(self.myNFA, log, workers=2, statistics=parallelStatistics)
+        self.assertEqual((parallelStatistics.number_of_searches, parallelStatistics.states_expanded), (4, statistics.states_expanded))
+        trieStatistics = conformance.SearchStatistics()
+        conformance.optimal_alignment_log_on_nfa(self.myNFA, log, shared_prefixes=True, statistics=trieStatistics)
+        self.assertEqual(trieStatistics.number_of_searches, 1)
+        replayStatistics = conformance.SearchStatistics()
+        self.assertTrue(conformance.is_trace_fitting(self.myNFA, ["a", "b", "c"], replayStatistics))
+        self.assertFalse(conformance.is_trace_fitting(self.myNFA, ["c"], replayStatistics))
+        self.assertEqual(replayStatistics.number_of_searches, 2)
+        self.assertGreater(replayStatistics.peak_frontier, 0)
+        regexStatistics = conformance.SearchStatistics()
+        conformance.optimal_alignment_trace_on_nfa(nfa_from_regex(["a", "*", ".", "b"]), ["a", "b"], statistics=regexStatistics)
+        self.assertGreater(regexStatistics.epsilon_moves, 0)
@@ -0,0 +1,23 @@
+from library.nfa import nfa_from_regex
+from library.dfa import LazyDfa
+from library import conformance
+import itertools
+import unittest
+class TestLazyDfa(unittest.TestCase):
+    def test_is_trace_fitting(self):
+        regex = ["(", "a", ".", "b", "*", ".", "c", "|", "a", ".", "(", "b", "|", "d", ")", ".", "d", ")", "*"]
+        myNfa = nfa_from_regex(list(regex))
+        myDfa = LazyDfa(myNfa)
+        for length in range(6):
+            for trace in itertools.product("abcdz", repeat=length):
+                self.assertEqual(myDfa.is_trace_fitting(list(trace)), conformance.is_trace_fitting(myNfa, list(trace)))
+        self.assertTrue(myDfa.is_trace_fitting([]))
+        self.assertLessEqual(myDfa.number_of_states, 10)
+
+    def test_bounded_cache(self):
+        myNfa = nfa_from_regex(["(", "a", "|", "b", ")", "*", ".", "a", ".", "(", "a", "|", "b", ")", ".", "(", "a", "|", "b", ")", ".", "(", "a", "|", "b", ")"])
+        myDfa = LazyDfa(myNfa, max_states=4)
+        log = [list(trace) for trace in itertools.product("ab", repeat=6)]
+        for _ in range(2):
+            self.assertEqual(myDfa.log_fittness(log), conformance.log_fittness(myNfa, log))
+            self.assertLessEqual(myDfa.number_of_states, 4)
@@ -0,0 +1,31 @@
+from library import event_log
+import os
+import tempfile
+import unittest
+class TestEventLog(unittest.TestCase):
+    def test_read_text_log(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "log.txt")
+            with open(path, "w") as file:
+                file.write("abc\nab\n\nbbc\n")
+            traces = event_log.read_text_log(path)
+            self.assertEqual(next(traces), ["a", "b", "c"])
+            self.assertEqual(list(traces), [["a", "b"], [], ["b", "b", "c"]])
+    def test_read_xes_log(self):
+        path = os.path.join(os.path.dirname(__file__), "..", "Performance Metrics", "running-example.xes")
+        traces = list(event_log.read_xes_log(path))
+        self.assertEqual(len(traces), 6)
+        self.assertEqual(traces[0], ["register request", "examine casually", "check ticket", "decide", "reinitiate request",
+                                     "examine thoroughly", "check ticket", "decide", "pay compensation"])
+        mapping = event_log.read_activity_mapping(os.path.join(os.path.dirname(__file__), "events_mapping.csv"))
+        self.assertEqual(mapping["register request"], "a")
+        traces = list(event_log.read_xes_log(path, mapping))
+        self.assertEqual(traces[0], ["a", "c", "b", "e", "f", "d", "b", "e", "g"])
+
+    def test_read_xes_log_without_namespace(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "log.xes")
+            with open(path, "w") as file:
+                file.write('<log><trace><string key="concept:name" value="1"/><event><string key="concept:name" value="x"/></event>'
+                           '<event><string key="org:resource" value="Pete"/></event></trace><trace></trace></log>')
+            self.assertEqual(list(event_log.read_xes_log(path, {"x": "a"})), [["a"], []])
@@ -0,0 +1,38 @@
+from library.nfa import nfa_from_regex
+from library.linear_memory import optimal_alignment_linear_memory
+from library.compact_alignment import CompactAlignment
+from library import conformance
+import itertools
+import unittest
+class TestLinearMemory(unittest.TestCase):
+    def assertValidAlignment(self, model, trace, alignment, cost):
+        self.assertEqual([trace_move for trace_move, _ in alignment if trace_move != '>>'], trace)
+        self.assertTrue(conformance.is_trace_fitting(model, [model_move for _, model_move in alignment if model_move != '>>']))
+        self.assertEqual(sum(1 for trace_move, model_move in alignment if trace_move != model_move), cost)
+
+    def test_same_cost_as_dijkstra(self):
+        regex = ["(", "a", ".", "b", "*", ".", "c", "|", "a", ".", "(", "b", "|", "d", ")", ".", "d", ")", "*", ".", "e"]
+        myNfa = nfa_from_regex(list(regex))
+        log = [list(trace) for length in range(5) for trace in itertools.product("abdez", repeat=length)]
+        for trace in log:
+            _, cost = conformance.optimal_alignment_trace_on_nfa(myNfa, trace)
+            # a small number of states forces the division down to segments of a single event
+            for max_states in (1, 1 << 16):
+                alignment, linear_cost = optimal_alignment_linear_memory(myNfa, trace, max_states=max_states)
+                self.assertEqual(linear_cost, cost)
+                self.assertValidAlignment(myNfa, trace, alignment, cost)
+
+    def test_long_trace(self):
+        myNfa = nfa_from_regex(list("(a.b.(c|d)*.e|f.(g|h).i)*"))
+        trace = list("abcce" "fgi" "abxe" "fi" "abde") * 60
+        alignment, cost = optimal_alignment_linear_memory(myNfa, trace, max_states=500)
+        self.assertEqual(cost, conformance.optimal_alignment_trace_on_nfa(myNfa, trace)[1])
+        self.assertValidAlignment(myNfa, trace, alignment, cost)
+        compact_alignment, _ = optimal_alignment_linear_memory(myNfa, trace, max_states=500, compact=True)
+        self.assertIsInstance(compact_alignment, CompactAlignment)
+        self.assertEqual(compact_alignment, alignment)
+        self.assertEqual(optimal_alignment_linear_memory(myNfa, trace, max_cost=cost - 1), (None, cost))
+        self.assertEqual(optimal_alignment_linear_memory(myNfa, trace, max_cost=cost)[1], cost)
+
+if __name__ == '__main__':
+    unittest.main()
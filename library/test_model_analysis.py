@@ -0,0 +1,41 @@
+from library.nfa import nfa_from_regex, CompiledNfa
+from library.model_analysis import ModelAnalysis, model_analysis
+from library.batch_alignment import BatchAligner
+from library import conformance
+import pickle
+import unittest
+class TestModelAnalysis(unittest.TestCase):
+    def setUp(self):
+        regex = ["(", "a", ".", "b", "*", ".", "c", "|", "a", ".", "(", "b", "|", "d", ")", ".", "d", ")", "*", ".", "e"]
+        self.model = CompiledNfa(nfa_from_regex(list(regex)))
+
+    def test_cached_with_model(self):
+        analysis = model_analysis(self.model)
+        self.assertIs(model_analysis(self.model), analysis)
+        self.assertIs(conformance.AlignmentHeuristic(self.model).distance_to_end, analysis.distance_to_end)
+        self.assertIs(BatchAligner(self.model).distances, analysis.distance_matrix)
+        # the analysis is sent along with the model to other processes
+        copied_model = pickle.loads(pickle.dumps(self.model))
+        self.assertIs(copied_model._analysis.model, copied_model)
+        self.assertEqual(copied_model._analysis.distance_to_end, analysis.distance_to_end)
+
+    def test_tables(self):
+        analysis = ModelAnalysis(self.model)
+        model = self.model
+        matrix = analysis.distance_matrix
+        for place in range(model.number_of_places):
+            self.assertEqual(analysis.epsilon_closures[place], model.epsilon_closure(place))
+            self.assertEqual(set(analysis.epsilon_closures[place]), {target for target in range(model.number_of_places) if matrix[place, target] == 0})
+            distance = min(int(matrix[place, end_place]) for end_place in model.end_places)
+            self.assertEqual(analysis.distance_to_end[place], float('inf') if distance == ModelAnalysis.INFINITY else distance)
+            for activity in model.activities[1:]:
+                activity_id = model.activity_id(activity)
+                activity_places = [start_place for start_place in range(model.number_of_places)
+                                   if activity_id in model.transition_activities[model.transition_offsets[start_place]:model.transition_offsets[start_place + 1]]]
+                distance = min(int(matrix[place, activity_place]) for activity_place in activity_places)
+                self.assertEqual(analysis.distance_to_activity(activity_id)[place], float('inf') if distance == ModelAnalysis.INFINITY else distance)
+                # an activity can still be produced if one of its transitions can be reached
+                self.assertEqual(bool(analysis.reachable_activities[place] & 1 << activity_id), distance != ModelAnalysis.INFINITY)
+
+if __name__ == '__main__':
+    unittest.main()
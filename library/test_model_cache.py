@@ -0,0 +1,55 @@
+from library.nfa import nfa_from_regex, CompiledNfa
+from library.model_cache import ModelCache, regex_fingerprint, model_fingerprint
+from library import conformance
+import os
+import tempfile
+import time
+import unittest
+class TestModelCache(unittest.TestCase):
+    def test_fingerprints(self):
+        regex = ["a", ".", "(", "b", "|", "c", ")", "*"]
+        self.assertEqual(regex_fingerprint(regex), regex_fingerprint(list(regex)))
+        self.assertNotEqual(regex_fingerprint(regex), regex_fingerprint(["a", ".", "(", "b", "|", "d", ")", "*"]))
+        self.assertNotEqual(regex_fingerprint(["ab"]), regex_fingerprint(["a", "b"]))
+        self.assertEqual(model_fingerprint(nfa_from_regex(list(regex))), model_fingerprint(nfa_from_regex(list(regex))))
+        self.assertNotEqual(model_fingerprint(nfa_from_regex(list(regex))), model_fingerprint(nfa_from_regex(["a"])))
+
+    def test_memory_cache(self):
+        cache = ModelCache(max_models=2)
+        first = cache.model_from_regex(["a", ".", "b"])
+        self.assertIs(cache.model_from_regex(["a", ".", "b"]), first)
+        cache.model_from_regex(["a"])
+        cache.model_from_regex(["b"])
+        self.assertEqual(len(cache), 2)
+        self.assertIsNot(cache.model_from_regex(["a", ".", "b"]), first)
+        self.assertIs(cache.compiled(nfa_from_regex(["b"])), cache.compiled(nfa_from_regex(["b"])))
+
+    def test_disk_cache(self):
+        regex = ["(", "a", ".", "b", "*", "|", "c", ")", ".", "d"]
+        with tempfile.TemporaryDirectory() as directory:
+            model = ModelCache(directory).model_from_regex(regex)
+            self.assertEqual(len([name for name in os.listdir(directory) if name.endswith(ModelCache.FILE_SUFFIX)]), 1)
+            loaded = ModelCache(directory).model_from_regex(regex)
+            self.assertIsNot(loaded, model)
+            self.assertEqual(model_fingerprint(loaded), model_fingerprint(model))
+            self.assertIsNone(loaded._stored_closures)
+            for trace in [["a", "b", "b", "d"], ["c", "d"], ["a", "c"]]:
+                self.assertEqual(conformance.optimal_alignment_trace_on_nfa(loaded, trace),
+                                 conformance.optimal_alignment_trace_on_nfa(nfa_from_regex(list(regex)), trace))
+
+    def test_large_star_model(self):
+        # the epsilon closures of chained stars grow with the square of the number of places, loading the model must not depend on them
+        regex = ["a", "*"]
+        for _ in range(1999):
+            regex += [".", "a", "*"]
+        with tempfile.TemporaryDirectory() as directory:
+            ModelCache(directory).model_from_regex(regex)
+            start_time = time.perf_counter()
+            loaded = ModelCache(directory).model_from_regex(regex)
+            load_time = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            built = CompiledNfa(nfa_from_regex(list(regex)))
+            build_time = time.perf_counter() - start_time
+            self.assertLessEqual(load_time, build_time)
+            self.assertEqual(model_fingerprint(loaded), model_fingerprint(built))
+            del loaded
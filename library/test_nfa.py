@@ -181,3 +181,36 @@ class TestNfa(unittest.TestCase):
 
 
 
+    def test_nfa_from_regex_large(self):
+        regex = ["a", "*", "|", "(", "b", ".", "c", ")", "*", ".", "(", "d", "|", "e", ")"]
+        expressionNfa = nfa.expression(list(regex))
+        regexNfa = nfa.nfa_from_regex(regex)
+        self.assertEqual(len(regex), 15)
+        self.assertEqual([place.label for place in regexNfa.places], [place.label for place in expressionNfa.places])
+        self.assertEqual([len(place.transitions) for place in regexNfa.places], [len(place.transitions) for place in expressionNfa.places])
+        # long and deeply nested expressions are built without recursion
+        longRegex = []
+        for i in range(20000):
+            longRegex += ["(", "a", "|", "b", ")", "."]
+        longRegex.append("c")
+        longNfa = nfa.nfa_from_regex(longRegex)
+        self.assertEqual(len(longNfa.places), 20000 * 6 + 4)
+        self.assertTrue(conformance.is_trace_fitting(longNfa, ["a", "b"] * 10000 + ["c"]))
+        self.assertFalse(conformance.is_trace_fitting(longNfa, ["a", "b"] * 10000))
+        deepNfa = nfa.nfa_from_regex(["("] * 5000 + ["a", "*"] + [")"] * 5000)
+        self.assertTrue(conformance.is_trace_fitting(deepNfa, ["a", "a"]))
+
+    def test_epsilon_free_nfa(self):
+        regex = ["a", "*", "|", "(", "b", ".", "c", ")", "|", "(", "d", ".", "e", ")"]
+        regexNfa = nfa.nfa_from_regex(list(regex))
+        compiledNfa = nfa.epsilon_free_nfa(regexNfa)
+        for place in compiledNfa.places:
+            for trans in place.transitions:
+                self.assertNotEqual(trans.activity, SpecialActivities.EPSILON)
+        self.assertLess(len(compiledNfa.places), len(regexNfa.places))
+        test_Traces = [["a", "b"], ["a", "a", "a"], [], ["b", "c"], ["d", "e"], ["d"], ["c", "b"]]
+        for trace in test_Traces:
+            self.assertEqual(conformance.is_trace_fitting(compiledNfa, trace), conformance.is_trace_fitting(regexNfa, trace))
+            self.assertEqual(conformance.optimal_alignment_trace_on_nfa(compiledNfa, trace)[1],
+                             conformance.optimal_alignment_trace_on_nfa(regexNfa, trace)[1])
+        self.assertEqual(nfa.epsilon_closure(self.p1), [self.p1])
@@ -0,0 +1,54 @@
+from library.nfa import Nfa, Place, Transition, nfa_from_regex
+from library.online import OnlineConformance
+from library import conformance
+import random
+import unittest
+class TestOnlineConformance(unittest.TestCase):
+    def setUp(self) :
+        self.myNFA = Nfa("TestNFA")
+        self.p1 = Place("Greating")
+        self.myNFA.add_place(self.p1, True)
+        self.p2 = Place("Start Small Talk")
+        self.myNFA.add_place(self.p2)
+        self.p3 = Place("End Small Talk")
+        self.myNFA.add_place(self.p3)
+        self.p4 = Place("Good Bye")
+        self.myNFA.add_place(self.p4, False, True)
+        self.myNFA.add_Transition(Transition("a", self.p1, self.p2))
+        self.myNFA.add_Transition(Transition("b", self.p2, self.p2))
+        self.myNFA.add_Transition(Transition("b", self.p2, self.p3))
+        self.myNFA.add_Transition(Transition("c", self.p3, self.p4))
+
+    def test_add_event(self):
+        case = OnlineConformance(self.myNFA)
+        self.assertEqual((case.prefix_cost, case.completion_cost), (0, 3))
+        self.assertEqual(case.add_event("a"), (0, 2))
+        self.assertEqual(case.add_event("z"), (1, 3))
+        self.assertEqual(case.add_event("b"), (1, 2))
+        self.assertEqual(case.add_event("c"), (1, 1))
+        self.assertEqual(case.prefix_alignment(), [("a", "a"), ("z", ">>"), ("b", "b"), ("c", "c")])
+        self.assertEqual(case.number_of_events, 4)
+
+    def test_no_reachable_end_place(self):
+        # the accepting place can not be reached, so no alignment of the case can end
+        myNfa = nfa_from_regex(list("a.b"))
+        myNfa.end_places = []
+        case = OnlineConformance(myNfa)
+        self.assertEqual((case.prefix_cost, case.completion_cost), (0, None))
+        self.assertEqual(case.add_event("a"), (0, None))
+        self.assertEqual(conformance.optimal_alignment_trace_on_nfa(myNfa, ["a"]), (None, None))
+
+    def test_costs_match_alignments(self):
+        myNfa = nfa_from_regex(["a", ".", "(", "b", "*", ")", ".", "(", "(", "c", ".", "d", ")", "*", ")"])
+        random.seed(7)
+        for _ in range(20):
+            case = OnlineConformance(myNfa)
+            trace = []
+            for _ in range(8):
+                trace.append(random.choice("abcdz"))
+                prefix_cost, completion_cost = case.add_event(trace[-1])
+                self.assertEqual(completion_cost, conformance.optimal_alignment_trace_on_nfa(myNfa, trace)[1])
+                self.assertLessEqual(prefix_cost, completion_cost)
+                alignment = case.prefix_alignment()
+                self.assertEqual([move[0] for move in alignment if move[0] != ">>"], trace)
+                self.assertEqual(len([move for move in alignment if move[0] != move[1]]), prefix_cost)
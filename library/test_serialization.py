@@ -0,0 +1,54 @@
+from library.nfa import nfa_from_regex, CompiledNfa
+from library.serialization import save_nfa, load_nfa, model_from_buffer
+from library.model_cache import model_fingerprint
+from library import conformance
+import os
+import pickle
+import tempfile
+import unittest
+class TestSerialization(unittest.TestCase):
+    def setUp(self):
+        self.regex = ["(", "a", ".", "b", "*", "|", "c", ")", "*", ".", "(", "d", "|", "e", ")"]
+        self.model = CompiledNfa(nfa_from_regex(list(self.regex)))
+        self.traces = [["a", "b", "d"], ["c", "c", "e"], ["d"], ["a", "x", "b"], []]
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model.cnfa")
+            save_nfa(nfa_from_regex(list(self.regex)), path, with_closures=True)
+            for use_mmap in [True, False]:
+                loaded = load_nfa(path, use_mmap)
+                self.assertEqual(model_fingerprint(loaded), model_fingerprint(self.model))
+                self.assertEqual(loaded.place_labels, self.model.place_labels)
+                self.assertEqual(loaded.activity_ids, self.model.activity_ids)
+                self.assertEqual(list(loaded.is_end_place), list(self.model.is_end_place))
+                # the stored closures are only copied out of the file when they are used
+                self.assertEqual(loaded._epsilon_closures, {})
+                self.assertEqual([loaded.epsilon_closure(place) for place in range(loaded.number_of_places)],
+                                 [self.model.epsilon_closure(place) for place in range(self.model.number_of_places)])
+                for trace in self.traces:
+                    self.assertEqual(conformance.optimal_alignment_trace_on_nfa(loaded, trace),
+                                     conformance.optimal_alignment_trace_on_nfa(self.model, trace))
+                    self.assertEqual(conformance.is_trace_fitting(loaded, trace), conformance.is_trace_fitting(self.model, trace))
+                # a loaded model can be sent to other processes
+                self.assertEqual(model_fingerprint(pickle.loads(pickle.dumps(loaded))), model_fingerprint(self.model))
+                del loaded
+
+    def test_without_closures(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model.cnfa")
+            save_nfa(self.model, path)
+            with open(path, "rb") as model_file:
+                loaded = model_from_buffer(model_file.read())
+            self.assertIsNone(loaded._stored_closures)
+            self.assertEqual(loaded.epsilon_closure(loaded.start_place), self.model.epsilon_closure(self.model.start_place))
+
+    def test_invalid_file(self):
+        self.assertRaises(ValueError, model_from_buffer, b"CNFA")
+        self.assertRaises(ValueError, model_from_buffer, b"XXXX" + bytes(40))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model.cnfa")
+            save_nfa(self.model, path)
+            with open(path, "rb") as model_file:
+                content = model_file.read()
+            self.assertRaises(ValueError, model_from_buffer, content[:60])